@@ -1,5 +1,3 @@
-import os
-import requests
 from pathlib import Path
 from typing import Optional
 from dotenv import load_dotenv
@@ -8,17 +6,13 @@ from dotenv import load_dotenv
 env_path = Path(__file__).parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
-from tavily import TavilyClient
+from shared_tools.aio import get_weather, tavily_search
 from google.adk.agents import Agent
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models.llm_request import LlmRequest
 from google.adk.models.llm_response import LlmResponse
 from google.genai import types
 
-OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
-TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
-
-
 # --- Guardrail Callback ---
 def block_keyword_guardrail(
     callback_context: CallbackContext, llm_request: LlmRequest
@@ -60,61 +54,6 @@ def block_keyword_guardrail(
 
 
 # --- Tools ---
-def get_weather(city: str) -> dict:
-    """Retrieves the current weather and temperature for a specified city.
-
-    Args:
-        city (str): The name of the city.
-
-    Returns:
-        dict: status and result or error msg.
-    """
-    if not OPENWEATHER_API_KEY:
-        return {"status": "error", "error_message": "OpenWeather API key not configured."}
-
-    base_url = "http://api.openweathermap.org/data/2.5/weather"
-    complete_url = f"{base_url}?q={city}&appid={OPENWEATHER_API_KEY}&units=metric"
-
-    try:
-        response = requests.get(complete_url)
-        data = response.json()
-
-        if response.status_code != 200:
-            return {"status": "error", "error_message": data.get("message", "Failed to fetch weather.")}
-
-        weather_description = data["weather"][0]["description"]
-        temperature = data["main"]["temp"]
-        return {
-            "status": "success",
-            "report": f"The current weather in {city} is {weather_description} with a temperature of {temperature}°C.",
-        }
-    except Exception as e:
-        return {"status": "error", "error_message": str(e)}
-
-
-def tavily_search(query: str) -> dict:
-    """Searches the web for information using Tavily.
-
-    Args:
-        query (str): The search query.
-
-    Returns:
-        dict: status and search results or error msg.
-    """
-    if not TAVILY_API_KEY:
-        return {"status": "error", "error_message": "Tavily API key not configured."}
-
-    try:
-        tavily = TavilyClient(api_key=TAVILY_API_KEY)
-        response = tavily.search(query=query, search_depth="basic")
-
-        results = response.get("results", [])
-        summary = "\n".join([f"Source: {res['url']}\nContent: {res['content']}" for res in results])
-        return {"status": "success", "report": summary}
-    except Exception as e:
-        return {"status": "error", "error_message": str(e)}
-
-
 # --- Agent Definition with Guardrail ---
 root_agent = Agent(
     name="guarded_agent",
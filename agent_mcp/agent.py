@@ -6,47 +6,29 @@ from dotenv import load_dotenv
 env_path = Path(__file__).parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
+from shared_tools.mcp_connection import McpConnection
+from shared_tools.sessions import get_or_create_session, make_session_service
 from google.adk.agents import Agent
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.adk.tools.mcp_tool import McpToolset, StreamableHTTPConnectionParams
+from google.adk.tools.mcp_tool import StreamableHTTPConnectionParams
 from google.genai import types
 
 
 # --- MCP Server Configuration ---
 MCP_SERVER_URL = "https://n8n220.app.n8n.cloud/mcp/21269dfe-0cd3-4c8b-9eda-f1674c747f47"
 
-
-async def create_agent_with_mcp():
-    """Create agent with MCP server tools."""
-
-    # Configure MCP connection
-    mcp_params = StreamableHTTPConnectionParams(url=MCP_SERVER_URL)
-
-    # Create MCP toolset
-    mcp_toolset = McpToolset(connection_params=mcp_params)
-
-    # Get tools from MCP server
-    tools = await mcp_toolset.get_tools()
-
-    print(f"✅ Connected to MCP server. Available tools: {[t.name for t in tools]}")
-
-    # Create agent with MCP tools
-    agent = Agent(
-        name="n8n_mcp_agent",
-        model="gemini-2.0-flash",
-        description="An agent that uses n8n MCP server tools.",
-        instruction=(
-            "You are an intelligent assistant. Use the tools exposed by the MCP server "
-            "to retrieve answers or perform actions. Use the MCP tools to answer the user's queries with accurate output."
-        ),
-        tools=tools,
-    )
-
-    return agent, mcp_toolset
+# One connection for every query: opened on first use, pinged every 30 s and
+# reopened if the server drops it. The discovered tools are saved next to
+# this file, so later runs build the agent without asking the server
+mcp_connection = McpConnection(
+    StreamableHTTPConnectionParams(url=MCP_SERVER_URL),
+    cache_path=Path(__file__).parent / ".mcp_tools.json",
+)
 
 
-# --- For ADK CLI compatibility ---
+# --- Agent ---
+# The connection is the agent's toolset: its tools come from the cache file,
+# or are listed on the first query when there is none yet
 root_agent = Agent(
     name="n8n_mcp_agent",
     model="gemini-2.0-flash",
@@ -55,45 +37,45 @@ root_agent = Agent(
         "You are an intelligent assistant. Use the tools exposed by the MCP server "
         "to retrieve answers or perform actions. Use the MCP tools to answer the user's queries with accurate output."
     ),
+    tools=[mcp_connection],
 )
 
 
 # --- Session and Runner for programmatic use ---
-session_service = InMemorySessionService()
+# In memory by default; set SESSION_DB=sessions.db to keep sessions across runs
+session_service = make_session_service()
 
 APP_NAME = "mcp_demo_app"
 USER_ID = "user_1"
 SESSION_ID = "session_001"
 
+runner = Runner(agent=root_agent, app_name=APP_NAME, session_service=session_service)
+
 
 async def run_mcp_agent(query: str):
     """Run the MCP agent with a query."""
-    agent, mcp_toolset = await create_agent_with_mcp()
-
-    await session_service.create_session(
-        app_name=APP_NAME,
-        user_id=USER_ID,
-        session_id=SESSION_ID
-    )
-
-    runner = Runner(
-        agent=agent,
-        app_name=APP_NAME,
-        session_service=session_service
-    )
+    await get_or_create_session(session_service, APP_NAME, USER_ID, SESSION_ID)
 
     print(f"\n>>> User Query: {query}")
     content = types.Content(role='user', parts=[types.Part(text=query)])
 
+    async for event in runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=content):
+        if event.is_final_response():
+            if event.content and event.content.parts:
+                print(f"<<< Agent Response: {event.content.parts[0].text}")
+            break
+
+
+async def main(queries: list[str]):
+    """Answer several queries over one MCP connection, then close it."""
     try:
-        async for event in runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=content):
-            if event.is_final_response():
-                if event.content and event.content.parts:
-                    print(f"<<< Agent Response: {event.content.parts[0].text}")
-                break
+        tools = await mcp_connection.get_tools()
+        print(f"✅ MCP server tools: {[t.name for t in tools]}")
+        for query in queries:
+            await run_mcp_agent(query)
     finally:
-        await mcp_toolset.close()
+        await mcp_connection.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(run_mcp_agent("What tools are available?"))
+    asyncio.run(main(["What tools are available?"]))
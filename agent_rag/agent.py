@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -6,13 +7,30 @@ from dotenv import load_dotenv
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
-import chromadb
-from pypdf import PdfReader
 from google.adk.agents import Agent
+from shared_tools import run_in_thread
 
-# Initialize ChromaDB client with persistent storage
+from .cache import QueryCache, normalize_query
+from .chunker import make_chunker
+from .embeddings import LocalEmbeddingProvider
+from .filters import build_filter
+from .retrieval import hybrid_search, reciprocal_rank_fusion
+from .store import VectorStore
+
+# ChromaDB persistent storage
 CHROMA_DB_PATH = Path(__file__).parent / "chroma_db"
-chroma_client = chromadb.PersistentClient(path=str(CHROMA_DB_PATH))
+
+# Tracks per-file and per-chunk content hashes for incremental ingestion
+MANIFEST_PATH = CHROMA_DB_PATH / "ingest_manifest.json"
+
+# BM25 keyword index kept in step with the collection
+BM25_PATH = CHROMA_DB_PATH / "bm25_index.json"
+
+# Per-source chunk/page counts and ingest times, maintained by ingestion
+CATALOG_PATH = CHROMA_DB_PATH / "catalog.json"
+
+# Document embeddings keyed by model and chunk hash, shared across collections
+EMBEDDING_CACHE_PATH = CHROMA_DB_PATH / "embedding_cache.sqlite3"
 
 # Collection name for our PDFs
 COLLECTION_NAME = "air_fryer_docs"
@@ -23,106 +41,182 @@ PDF_FILES = [
     Path(__file__).parent / "air_fryer_warranty.pdf",
 ]
 
-
-def extract_text_from_pdf(pdf_path: Path) -> list[dict]:
-    """Extract text from a PDF file, returning chunks with metadata."""
-    reader = PdfReader(pdf_path)
-    chunks = []
-
-    for page_num, page in enumerate(reader.pages):
-        text = page.extract_text()
-        if text and text.strip():
-            # Split into smaller chunks for better retrieval
-            paragraphs = text.split('\n\n')
-            for para in paragraphs:
-                para = para.strip()
-                if len(para) > 50:  # Only keep substantial chunks
-                    chunks.append({
-                        "text": para,
-                        "source": pdf_path.name,
-                        "page": page_num + 1
-                    })
-
-    return chunks
-
-
-def initialize_vector_db() -> None:
-    """Load PDFs into ChromaDB if not already done."""
-    try:
-        collection = chroma_client.get_collection(COLLECTION_NAME)
-        if collection.count() > 0:
-            return  # Already initialized
-    except:
-        pass
-
-    # Create or get collection
-    collection = chroma_client.get_or_create_collection(
-        name=COLLECTION_NAME,
-        metadata={"description": "Air fryer product and warranty documentation"}
-    )
-
-    # Extract and add documents
-    all_chunks = []
-    all_ids = []
-    all_metadatas = []
-
-    for pdf_path in PDF_FILES:
-        if pdf_path.exists():
-            chunks = extract_text_from_pdf(pdf_path)
-            for i, chunk in enumerate(chunks):
-                all_chunks.append(chunk["text"])
-                all_ids.append(f"{pdf_path.stem}_{i}")
-                all_metadatas.append({
-                    "source": chunk["source"],
-                    "page": chunk["page"]
-                })
-
-    if all_chunks:
-        collection.add(
-            documents=all_chunks,
-            ids=all_ids,
-            metadatas=all_metadatas
-        )
-        print(f"Indexed {len(all_chunks)} chunks from PDFs into ChromaDB")
+# Opened on the first tool call (or by the warm-up below), not at import
+vector_store = VectorStore(
+    db_path=CHROMA_DB_PATH,
+    collection_name=COLLECTION_NAME,
+    pdf_files=PDF_FILES,
+    manifest_path=MANIFEST_PATH,
+    description="Air fryer product and warranty documentation",
+    # "sentence" (default), "fixed" or "paragraph"; see chunker.py
+    chunker=make_chunker(os.getenv("RAG_CHUNKER", "sentence")),
+    bm25_path=BM25_PATH,
+    catalog_path=CATALOG_PATH,
+    embedder=LocalEmbeddingProvider(
+        batch_size=int(os.getenv("RAG_EMBED_BATCH_SIZE", "64")),
+        max_workers=int(os.getenv("RAG_EMBED_WORKERS", "1")),
+        cache_path=EMBEDDING_CACHE_PATH,
+    ),
+)
 
 
-def query_documents(query: str, n_results: int = 5) -> dict:
+def _format_hit(hit: dict) -> dict:
+    return {
+        "content": hit["content"],
+        "source": hit["source"],
+        "page": hit["page"],
+        "page_end": hit["page_end"],
+    }
+
+
+def _resolve_sources(source: str) -> list[str]:
+    """Match a source name, or part of one, against the indexed documents."""
+    sources = list(vector_store.get_catalog()["sources"])
+    if source in sources:
+        return [source]
+    wanted = source.lower()
+    return [name for name in sources if wanted in name.lower()]
+
+
+def _search_filter(source: str, page_start: int, page_end: int) -> dict | None:
+    """Build the metadata filter for the tools' optional filter arguments."""
+    sources = None
+    if source:
+        sources = _resolve_sources(source)
+        if not sources:
+            raise ValueError(f"No indexed document matches source '{source}'.")
+    return build_filter(sources, page_start, page_end)
+
+
+@run_in_thread
+def query_documents(
+    query: str,
+    n_results: int = 5,
+    source: str = "",
+    page_start: int = 0,
+    page_end: int = 0,
+) -> dict:
     """Query the vector database for relevant documents.
 
     Args:
         query (str): The search query to find relevant information.
         n_results (int): Number of results to return (default 5).
+        source (str): Only search this document, e.g. "air_fryer_warranty.pdf"
+            or "warranty" (default: all documents).
+        page_start (int): Only search from this page on (default: first page).
+        page_end (int): Only search up to this page (default: last page).
 
     Returns:
         dict: Status and relevant document chunks with sources.
     """
     try:
-        collection = chroma_client.get_collection(COLLECTION_NAME)
-
-        results = collection.query(
-            query_texts=[query],
-            n_results=n_results
-        )
-
-        if not results["documents"][0]:
-            return {
+        collection = vector_store.get_collection()
+        where = _search_filter(source, page_start, page_end)
+
+        cache_key = (normalize_query(query), n_results, repr(where))
+        cached = query_cache.get(cache_key, vector_store.version)
+        if cached is not None:
+            return cached
+
+        hits = hybrid_search(
+            collection,
+            vector_store.sparse_index,
+            [query],
+            n_results,
+            vector_store.embedder,
+            where,
+        )[0]
+
+        if not hits:
+            response = {
                 "status": "success",
                 "message": "No relevant documents found for your query."
             }
-
-        # Format results with sources
-        formatted_results = []
-        for doc, metadata in zip(results["documents"][0], results["metadatas"][0]):
-            formatted_results.append({
-                "content": doc,
-                "source": metadata["source"],
-                "page": metadata["page"]
-            })
-
+        else:
+            # Format results with sources
+            response = {
+                "status": "success",
+                "results": [_format_hit(hit) for hit in hits]
+            }
+        query_cache.put(cache_key, response, vector_store.version)
+        return response
+    except Exception as e:
         return {
-            "status": "success",
-            "results": formatted_results
+            "status": "error",
+            "error_message": f"Failed to query documents: {str(e)}"
         }
+
+
+@run_in_thread
+def query_documents_batch(
+    queries: list[str],
+    n_results: int = 5,
+    source: str = "",
+    page_start: int = 0,
+    page_end: int = 0,
+) -> dict:
+    """Search the vector database for several queries at once.
+
+    Use this for questions with more than one aspect, e.g. "warranty length"
+    and "cleaning instructions". All queries are searched in one call and
+    chunks found by several queries are returned only once.
+
+    Args:
+        queries (list[str]): The search queries, one per aspect of the question.
+        n_results (int): Number of results to fetch per query (default 5).
+        source (str): Only search this document, e.g. "air_fryer_warranty.pdf"
+            or "warranty" (default: all documents).
+        page_start (int): Only search from this page on (default: first page).
+        page_end (int): Only search up to this page (default: last page).
+
+    Returns:
+        dict: Status and the merged document chunks with sources, best first.
+    """
+    try:
+        collection = vector_store.get_collection()
+        where = _search_filter(source, page_start, page_end)
+
+        # Drop duplicate queries, keeping the first spelling of each
+        unique = {}
+        for query in queries:
+            unique.setdefault(normalize_query(query), query)
+        if not unique:
+            return {"status": "error", "error_message": "No queries given."}
+
+        cache_key = ("batch", tuple(unique), n_results, repr(where))
+        cached = query_cache.get(cache_key, vector_store.version)
+        if cached is not None:
+            return cached
+
+        ranked_lists = hybrid_search(
+            collection,
+            vector_store.sparse_index,
+            list(unique.values()),
+            n_results,
+            vector_store.embedder,
+            where,
+        )
+        matched = {}
+        for query, hits in zip(unique.values(), ranked_lists):
+            for hit in hits:
+                matched.setdefault(hit["id"], []).append(query)
+
+        fused = reciprocal_rank_fusion(ranked_lists)
+        if not fused:
+            response = {
+                "status": "success",
+                "message": "No relevant documents found for your queries."
+            }
+        else:
+            response = {
+                "status": "success",
+                "results": [
+                    {**_format_hit(hit), "matched_queries": matched[hit["id"]]}
+                    for hit in fused
+                ]
+            }
+        query_cache.put(cache_key, response, vector_store.version)
+        return response
     except Exception as e:
         return {
             "status": "error",
@@ -130,6 +224,7 @@ def query_documents(query: str, n_results: int = 5) -> dict:
         }
 
 
+@run_in_thread
 def get_document_info() -> dict:
     """Get information about the indexed documents.
 
@@ -137,19 +232,14 @@ def get_document_info() -> dict:
         dict: Status and information about available documents.
     """
     try:
-        collection = chroma_client.get_collection(COLLECTION_NAME)
-        count = collection.count()
-
-        # Get unique sources
-        all_data = collection.get()
-        sources = set()
-        for metadata in all_data["metadatas"]:
-            sources.add(metadata["source"])
+        # Answered from the catalog kept by ingestion, not by scanning chunks
+        catalog = vector_store.get_catalog()
 
         return {
             "status": "success",
-            "total_chunks": count,
-            "documents": list(sources),
+            "total_chunks": catalog["total_chunks"],
+            "documents": list(catalog["sources"]),
+            "details": catalog["sources"],
             "description": "Air fryer product information and warranty documentation"
         }
     except Exception as e:
@@ -159,8 +249,17 @@ def get_document_info() -> dict:
         }
 
 
-# Initialize the vector database on module load
-initialize_vector_db()
+# Recent query_documents results; hit/miss counters via query_cache.stats()
+query_cache = QueryCache(maxsize=256, ttl=600)
+
+# Set RAG_WARMUP=1 to open and sync the vector store in the background at
+# startup instead of on the first query (skipped in PDF extraction workers,
+# which import this package when they are spawned)
+if (
+    os.getenv("RAG_WARMUP", "").lower() in ("1", "true", "yes")
+    and multiprocessing.parent_process() is None
+):
+    vector_store.start_warmup()
 
 # Create the RAG agent
 root_agent = Agent(
@@ -170,10 +269,14 @@ root_agent = Agent(
     instruction="""
     You are a helpful assistant that answers questions about the air fryer product and warranty.
 
-    You have access to two tools:
+    You have access to three tools:
     1. query_documents: Use this to search the vector database for relevant information.
        Always use this tool to find information before answering questions.
-    2. get_document_info: Use this to see what documents are available.
+       When the question is clearly about one document (e.g. the warranty), pass its
+       name as source so only that document is searched.
+    2. query_documents_batch: Use this instead of several query_documents calls when a
+       question has more than one aspect, passing one query per aspect.
+    3. get_document_info: Use this to see what documents are available.
 
     When answering questions:
     - Always search the documents first using query_documents
@@ -182,5 +285,5 @@ root_agent = Agent(
     - If the information is not found in the documents, say so clearly
     - Be helpful and provide complete answers based on the available information
     """,
-    tools=[query_documents, get_document_info],
+    tools=[query_documents, query_documents_batch, get_document_info],
 )
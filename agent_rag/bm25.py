@@ -0,0 +1,167 @@
+"""In-process BM25 keyword index kept alongside the Chroma collection.
+
+Dense vectors are poor at exact-term lookups such as model numbers, error
+codes or clause numbers. This inverted index is updated by the same ingestion
+pass that writes to Chroma, persisted next to the database, and searched in
+microseconds without embedding the query.
+"""
+import json
+import math
+import re
+from collections import Counter
+from pathlib import Path
+
+from .filters import matches_filter
+
+_TERM_RE = re.compile(r"\w+")
+# Dotted or dashed runs ("4.2", "af-200", "2024-01-05")
+_COMPOUND_RE = re.compile(r"\w+(?:[.-]\w+)+")
+_WORD_OR_COMPOUND_RE = re.compile(r"\w+(?:[.-]\w+)*")
+_ORDINAL_RE = re.compile(r"\d+(?:st|nd|rd|th)")
+MAX_KEYWORD_QUERY_TERMS = 6
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens used for both indexing and querying.
+
+    Dotted or dashed runs containing a digit are also kept whole ("4.2"
+    besides "4" and "2"), so an identifier can be matched exactly.
+    """
+    text = text.lower()
+    compounds = [term for term in _COMPOUND_RE.findall(text) if any(c.isdigit() for c in term)]
+    return _TERM_RE.findall(text) + compounds
+
+
+def identifiers(text: str) -> list[str]:
+    """Identifier-like terms: letters mixed with digits ("HD9285", "E3") or
+    dotted/dashed numbers ("4.2", "AF-200"). Plain numbers ("year 1",
+    "200 degrees") and ordinals ("1st") are not identifiers.
+    """
+    return [
+        term for term in _WORD_OR_COMPOUND_RE.findall(text.lower())
+        if any(c.isdigit() for c in term) and not term.isdigit() and not _ORDINAL_RE.fullmatch(term)
+    ]
+
+
+class BM25Index:
+    """Okapi BM25 over chunk texts, keyed by the same IDs as the collection."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.revision = None
+        self._clear()
+
+    def _clear(self) -> None:
+        self.docs = {}  # id -> {"content", "source", "page", "page_end"}
+        self.doc_lengths = {}
+        self.postings = {}  # term -> {id: term frequency}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def is_keyword_query(self, query: str) -> bool:
+        """Whether a query is a short lookup of an identifier this index contains.
+
+        Identifiers missing from the index fall through to the vector search,
+        as do ordinary questions that merely mention a number.
+        """
+        if not 0 < len(_TERM_RE.findall(query)) <= MAX_KEYWORD_QUERY_TERMS:
+            return False
+        # Whole identifiers only: "4.2" must occur as such, not as a 4 and a 2
+        terms = identifiers(query)
+        return bool(terms) and all(term in self.postings for term in terms)
+
+    def add(self, doc_id: str, text: str, metadata: dict) -> None:
+        if doc_id in self.docs:
+            self.remove(doc_id)
+        terms = tokenize(text)
+        self.docs[doc_id] = {"content": text, **metadata}
+        self.doc_lengths[doc_id] = len(terms)
+        self.total_length += len(terms)
+        for term, tf in Counter(terms).items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+
+    def update_metadata(self, doc_id: str, metadata: dict) -> None:
+        if doc_id in self.docs:
+            self.docs[doc_id].update(metadata)
+
+    def remove(self, doc_id: str) -> None:
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        for term in set(tokenize(doc["content"])):
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+
+    def search(self, query: str, n_results: int = 5, where: dict | None = None) -> list[dict]:
+        """Return up to ``n_results`` hits, best first, in the search() format.
+
+        ``where`` is a filters.build_filter() spec; chunks that fail it are
+        skipped before scoring.
+        """
+        n_docs = len(self.docs)
+        if not n_docs:
+            return []
+        avg_length = self.total_length / n_docs
+        scores = Counter()
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                if where and not matches_filter(self.docs[doc_id], where):
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return [
+            {"id": doc_id, **self.docs[doc_id], "bm25": round(score, 4)}
+            for doc_id, score in scores.most_common(n_results)
+        ]
+
+    def rebuild(self, collection, batch_size: int = 1000) -> None:
+        """Re-index every chunk in a Chroma collection."""
+        self._clear()
+        offset = 0
+        while True:
+            batch = collection.get(
+                include=["documents", "metadatas"], limit=batch_size, offset=offset
+            )
+            for doc_id, text, metadata in zip(batch["ids"], batch["documents"], batch["metadatas"]):
+                self.add(doc_id, text, {
+                    "source": metadata["source"],
+                    "page": metadata["page"],
+                    "page_end": metadata.get("page_end", metadata["page"]),
+                })
+            if len(batch["ids"]) < batch_size:
+                break
+            offset += batch_size
+
+    def save(self, path: Path) -> None:
+        """Atomically write the index (postings are rebuilt on load)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"revision": self.revision, "k1": self.k1, "b": self.b, "docs": self.docs}, f)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        """Load a saved index, or return an empty one."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        index = cls(k1=data["k1"], b=data["b"])
+        for doc_id, doc in data["docs"].items():
+            doc = dict(doc)
+            index.add(doc_id, doc.pop("content"), doc)
+        index.revision = data["revision"]
+        return index
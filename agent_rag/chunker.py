@@ -0,0 +1,227 @@
+"""Chunking strategies for PDF ingestion.
+
+Every chunker turns the pages of one document into chunks of roughly even
+size, measured in tokens:
+
+- ``paragraph``: the original behaviour, one chunk per blank-line separated
+  paragraph of a page, dropping fragments under 50 characters.
+- ``fixed``: fixed-size token windows with overlap.
+- ``sentence``: whole sentences packed up to a token budget, with the last
+  sentences of a chunk repeated at the start of the next.
+
+``fixed`` and ``sentence`` treat a document as one continuous text, so chunks
+can span page breaks; each chunk records its first and last page.
+
+Tokens are approximated as words and punctuation marks, which tracks the
+sub-word tokenizers used by embedding models closely enough for sizing.
+"""
+import re
+from bisect import bisect_right
+from statistics import mean
+from typing import Iterable, Iterator
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+# Sentence ends, or a line break before a bullet or numbered heading
+_SENTENCE_BREAK_RE = re.compile(r"(?<=[.!?])\s+|\n(?=\s*(?:[-•*]|\d+(?:\.\d+)*\.?\s))")
+
+
+def count_tokens(text: str) -> int:
+    """Approximate the number of tokens in a piece of text."""
+    return len(_TOKEN_RE.findall(text))
+
+
+class _Document:
+    """The pages of one document joined into a single text."""
+
+    def __init__(self, pages: Iterable[tuple[int, str]]):
+        parts = []
+        self.page_starts = []
+        self.page_numbers = []
+        offset = 0
+        for page_num, text in pages:
+            text = (text or "").strip()
+            if not text:
+                continue
+            self.page_starts.append(offset)
+            self.page_numbers.append(page_num)
+            parts.append(text)
+            offset += len(text) + 1
+        self.text = "\n".join(parts)
+
+    def page_at(self, offset: int) -> int:
+        return self.page_numbers[bisect_right(self.page_starts, offset) - 1]
+
+    def tokens(self, start: int = 0, end: int | None = None) -> list[tuple[int, int]]:
+        """(start, end) offsets of the tokens in text[start:end]."""
+        end = len(self.text) if end is None else end
+        return [(m.start() + start, m.end() + start) for m in _TOKEN_RE.finditer(self.text[start:end])]
+
+    def chunk(self, start: int, end: int, n_tokens: int) -> dict:
+        return {
+            "text": self.text[start:end],
+            "page": self.page_at(start),
+            "page_end": self.page_at(end - 1),
+            "n_tokens": n_tokens,
+        }
+
+
+class ParagraphChunker:
+    """One chunk per paragraph of a page (the original strategy)."""
+
+    name = "paragraph"
+
+    def __init__(self, min_chars: int = 50):
+        self.min_chars = min_chars
+
+    def signature(self) -> str:
+        return f"{self.name}:{self.min_chars}"
+
+    def chunk(self, pages: Iterable[tuple[int, str]]) -> Iterator[dict]:
+        for page_num, text in pages:
+            if text and text.strip():
+                for para in text.split('\n\n'):
+                    para = para.strip()
+                    if len(para) > self.min_chars:
+                        yield {
+                            "text": para,
+                            "page": page_num,
+                            "page_end": page_num,
+                            "n_tokens": count_tokens(para),
+                        }
+
+
+class FixedTokenChunker:
+    """Windows of ``max_tokens`` tokens, each overlapping the previous one."""
+
+    name = "fixed"
+
+    def __init__(self, max_tokens: int = 200, overlap: int = 40):
+        if not 0 <= overlap < max_tokens:
+            raise ValueError("overlap must be at least 0 and less than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap = overlap
+
+    def signature(self) -> str:
+        return f"{self.name}:{self.max_tokens}:{self.overlap}"
+
+    def chunk(self, pages: Iterable[tuple[int, str]]) -> Iterator[dict]:
+        doc = _Document(pages)
+        tokens = doc.tokens()
+        step = self.max_tokens - self.overlap
+        for i in range(0, len(tokens), step):
+            window = tokens[i:i + self.max_tokens]
+            yield doc.chunk(window[0][0], window[-1][1], len(window))
+            if i + self.max_tokens >= len(tokens):
+                break
+
+
+class SentenceChunker:
+    """Whole sentences packed into chunks of at most ``max_tokens`` tokens.
+
+    Sentences longer than the budget are cut into token windows. The trailing
+    sentences of each chunk, up to ``overlap`` tokens, are repeated at the
+    start of the next one. A final chunk smaller than ``min_tokens`` is merged
+    into the previous chunk instead of being emitted on its own.
+    """
+
+    name = "sentence"
+
+    def __init__(self, max_tokens: int = 200, overlap: int = 40, min_tokens: int = 20):
+        if not 0 <= overlap < max_tokens:
+            raise ValueError("overlap must be at least 0 and less than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap = overlap
+        self.min_tokens = min_tokens
+
+    def signature(self) -> str:
+        return f"{self.name}:{self.max_tokens}:{self.overlap}:{self.min_tokens}"
+
+    def _sentences(self, doc: _Document) -> Iterator[tuple[int, int, int]]:
+        """Yield (start, end, n_tokens) for each sentence, splitting long ones."""
+        start = 0
+        for match in [*_SENTENCE_BREAK_RE.finditer(doc.text), None]:
+            end = match.start() if match else len(doc.text)
+            tokens = doc.tokens(start, end)
+            for i in range(0, len(tokens), self.max_tokens):
+                piece = tokens[i:i + self.max_tokens]
+                yield piece[0][0], piece[-1][1], len(piece)
+            if match:
+                start = match.end()
+
+    def chunk(self, pages: Iterable[tuple[int, str]]) -> Iterator[dict]:
+        doc = _Document(pages)
+        current = []  # (start, end, n_tokens) of the sentences in this chunk
+        current_tokens = 0
+        previous = None  # last chunk, held back in case the tail is merged into it
+
+        for sentence in self._sentences(doc):
+            if current and current_tokens + sentence[2] > self.max_tokens:
+                if previous:
+                    yield doc.chunk(*previous)
+                previous = (current[0][0], current[-1][1], current_tokens)
+
+                carried = []
+                carried_tokens = 0
+                for s in reversed(current):
+                    if carried_tokens + s[2] > self.overlap:
+                        break
+                    carried.insert(0, s)
+                    carried_tokens += s[2]
+                # Only carry overlap that leaves room for the new sentence.
+                if carried_tokens + sentence[2] > self.max_tokens:
+                    carried, carried_tokens = [], 0
+                current, current_tokens = carried, carried_tokens
+            current.append(sentence)
+            current_tokens += sentence[2]
+
+        if current:
+            tail = (current[0][0], current[-1][1], current_tokens)
+            if previous and current_tokens < self.min_tokens:
+                # Count only the tokens the tail adds beyond the previous chunk.
+                added = len(doc.tokens(previous[1], tail[1]))
+                previous = (previous[0], tail[1], previous[2] + added)
+            else:
+                if previous:
+                    yield doc.chunk(*previous)
+                previous = tail
+        if previous:
+            yield doc.chunk(*previous)
+
+
+CHUNKERS = {
+    cls.name: cls for cls in (ParagraphChunker, FixedTokenChunker, SentenceChunker)
+}
+
+
+def make_chunker(strategy: str = "sentence", **options):
+    """Create a chunker by strategy name ("paragraph", "fixed" or "sentence")."""
+    try:
+        return CHUNKERS[strategy](**options)
+    except KeyError:
+        raise ValueError(
+            f"Unknown chunking strategy {strategy!r}; expected one of {sorted(CHUNKERS)}"
+        ) from None
+
+
+class ChunkStats:
+    """Collects chunk sizes during ingestion and summarises them."""
+
+    def __init__(self):
+        self.sizes = []
+
+    def add(self, n_tokens: int) -> None:
+        self.sizes.append(n_tokens)
+
+    def summary(self) -> dict:
+        if not self.sizes:
+            return {"chunks": 0}
+        sizes = sorted(self.sizes)
+        return {
+            "chunks": len(sizes),
+            "min_tokens": sizes[0],
+            "mean_tokens": round(mean(sizes), 1),
+            "p50_tokens": sizes[len(sizes) // 2],
+            "p95_tokens": sizes[min(len(sizes) - 1, int(len(sizes) * 0.95))],
+            "max_tokens": sizes[-1],
+        }
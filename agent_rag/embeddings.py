@@ -0,0 +1,171 @@
+"""Embedding providers for the RAG agent.
+
+The store computes embeddings itself instead of relying on the collection's
+implicit default, so batch size, threading and the model are under our
+control. Document embeddings are cached on disk keyed by the chunk's content
+hash (and the model), so re-ingesting unchanged text, or the same text in
+another collection, never runs the encoder again.
+"""
+import hashlib
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+
+def text_sha256(text: str) -> str:
+    """Hash a chunk's text (the key used for cached embeddings)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingProvider(ABC):
+    """Interface for turning texts into vectors.
+
+    Subclasses implement ``signature`` (which changes whenever the produced
+    vectors would) and ``embed``.
+    """
+
+    @abstractmethod
+    def signature(self) -> str:
+        """Identify the model and settings behind the vectors."""
+
+    @abstractmethod
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Embed documents, returning a (len(texts), dim) float32 array."""
+
+    def embed_queries(self, queries: list[str]) -> np.ndarray:
+        """Embed search queries; by default the same as documents."""
+        return self.embed(queries)
+
+
+class EmbeddingCache:
+    """SQLite store of vectors keyed by (model, content hash)."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, hash TEXT NOT NULL, vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, hash))"
+        )
+        self._lock = threading.Lock()
+
+    def get_many(self, model: str, hashes: list[str]) -> dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            for i in range(0, len(hashes), 500):
+                batch = hashes[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({','.join('?' * len(batch))})",
+                    [model, *batch],
+                )
+                for digest, blob in rows:
+                    found[digest] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, model: str, vectors: dict[str, np.ndarray]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, hash, vector) VALUES (?, ?, ?)",
+                [(model, digest, vector.astype(np.float32).tobytes()) for digest, vector in vectors.items()],
+            )
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """CPU embeddings from a local ONNX model, encoded in NumPy batches.
+
+    By default this runs the same all-MiniLM-L6-v2 model that Chroma uses
+    when no embedding function is given, so vectors are unchanged.
+
+    Args:
+        model: Callable mapping a list of texts to vectors (default: Chroma's
+            ONNX all-MiniLM-L6-v2, created on first use).
+        model_name (str): Identifies ``model`` in the cache and manifest.
+        batch_size (int): Texts per encoder call.
+        max_workers (int): Batches encoded concurrently. ONNX Runtime already
+            uses several cores per call, so raise this only on large machines.
+        cache_path (Path | None): SQLite file for cached document embeddings.
+    """
+
+    def __init__(
+        self,
+        model=None,
+        model_name: str = "all-MiniLM-L6-v2",
+        batch_size: int = 64,
+        max_workers: int = 1,
+        cache_path: Path | None = None,
+    ):
+        self._model = model
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.cache_path = cache_path
+        self._cache = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self.encoded = 0
+        self.cache_hits = 0
+
+    def signature(self) -> str:
+        return f"local:{self.model_name}"
+
+    def _setup(self) -> None:
+        with self._lock:
+            if self._model is None:
+                from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+                self._model = ONNXMiniLM_L6_V2()
+            if self._cache is None and self.cache_path:
+                self._cache = EmbeddingCache(self.cache_path)
+            if self._executor is None and self.max_workers > 1:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="rag-embed"
+                )
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        """Encode texts in batches of ``batch_size``."""
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+
+        def encode_batch(batch):
+            return np.asarray(self._model(batch), dtype=np.float32)
+
+        if self._executor is not None and len(batches) > 1:
+            encoded = list(self._executor.map(encode_batch, batches))
+        else:
+            encoded = [encode_batch(batch) for batch in batches]
+        self.encoded += len(texts)
+        return np.vstack(encoded)
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        self._setup()
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        if self._cache is None:
+            return self._encode(texts)
+
+        hashes = [text_sha256(text) for text in texts]
+        vectors = self._cache.get_many(self.model_name, list(set(hashes)))
+        self.cache_hits += sum(digest in vectors for digest in hashes)
+
+        missing = {}
+        for digest, text in zip(hashes, texts):
+            if digest not in vectors:
+                missing.setdefault(digest, text)
+        if missing:
+            encoded = dict(zip(missing, self._encode(list(missing.values()))))
+            self._cache.put_many(self.model_name, encoded)
+            vectors.update(encoded)
+        return np.vstack([vectors[digest] for digest in hashes])
+
+    def embed_queries(self, queries: list[str]) -> np.ndarray:
+        # Queries are rarely repeated verbatim; keep them out of the disk cache.
+        self._setup()
+        return self._encode(queries)
+
+    def stats(self) -> dict:
+        """How many texts were encoded versus served from the cache."""
+        return {"encoded": self.encoded, "cache_hits": self.cache_hits}
@@ -0,0 +1,51 @@
+"""Metadata filters for restricting searches to some sources or pages.
+
+A filter is a small dict built by ``build_filter``. It is translated into a
+Chroma ``where`` clause for the vector search and checked directly against
+chunk metadata by the BM25 index, so both searches skip the same chunks.
+"""
+
+
+def build_filter(sources: list[str] | None = None, page_start: int = 0, page_end: int = 0) -> dict | None:
+    """Describe a metadata filter, or return None when nothing is filtered.
+
+    Args:
+        sources (list[str] | None): Only search chunks from these files.
+        page_start (int): Only chunks ending on or after this page (0 = no limit).
+        page_end (int): Only chunks starting on or before this page (0 = no limit).
+    """
+    spec = {}
+    if sources:
+        spec["sources"] = sorted(sources)
+    if page_start > 0:
+        spec["page_start"] = page_start
+    if page_end > 0:
+        spec["page_end"] = page_end
+    return spec or None
+
+
+def chroma_where(spec: dict | None) -> dict | None:
+    """Translate a build_filter() spec into a Chroma ``where`` clause."""
+    if not spec:
+        return None
+    clauses = []
+    if "sources" in spec:
+        clauses.append({"source": {"$in": spec["sources"]}})
+    if "page_start" in spec:
+        clauses.append({"page_end": {"$gte": spec["page_start"]}})
+    if "page_end" in spec:
+        clauses.append({"page": {"$lte": spec["page_end"]}})
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def matches_filter(metadata: dict, spec: dict | None) -> bool:
+    """Whether chunk metadata passes a build_filter() spec."""
+    if not spec:
+        return True
+    if "sources" in spec and metadata["source"] not in spec["sources"]:
+        return False
+    if "page_start" in spec and metadata["page_end"] < spec["page_start"]:
+        return False
+    if "page_end" in spec and metadata["page"] > spec["page_end"]:
+        return False
+    return True
@@ -0,0 +1,373 @@
+"""Incremental PDF ingestion for the RAG agent.
+
+A JSON manifest stored next to the Chroma database records a content hash for
+every indexed PDF and for every chunk taken from it. Each sync compares the
+PDFs on disk against the manifest and only adds, updates or deletes the chunks
+that actually changed, so unchanged files are never re-parsed or re-embedded.
+
+Changed files are streamed: pages are extracted in a process pool, split by a
+pluggable chunker (see ``chunker.py``) and written to Chroma in bounded batches, so peak memory
+does not grow with the size of the corpus.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import groupby
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from pypdf import PdfReader
+
+from .chunker import ChunkStats, make_chunker
+from .embeddings import text_sha256
+
+MANIFEST_VERSION = 1
+
+# Pages handed to one extraction worker at a time
+PAGES_PER_TASK = 16
+
+# Below this many pages a process pool costs more than it saves
+MIN_PAGES_FOR_POOL = 64
+
+# Maximum number of chunks sent to Chroma in a single write
+WRITE_BATCH_SIZE = 256
+
+
+def file_sha256(path: Path) -> str:
+    """Hash a file's bytes without reading it into memory at once."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _extract_page_range(pdf_path: str, start: int, stop: int) -> list[tuple[int, str]]:
+    """Extract the text of pages [start, stop) of a PDF (runs in a worker)."""
+    reader = PdfReader(pdf_path)
+    return [
+        (page_num + 1, reader.pages[page_num].extract_text() or "")
+        for page_num in range(start, stop)
+    ]
+
+
+def count_pages(pdf_path: Path) -> int:
+    """Return the number of pages in a PDF."""
+    return len(PdfReader(pdf_path).pages)
+
+
+def iter_pages(
+    pdf_files: list[Path], executor=None, max_in_flight: int = 8, page_counts: dict | None = None
+) -> Iterator[tuple[Path, int, str]]:
+    """Yield (pdf_path, page_number, text) for every page, in document order.
+
+    With an executor, page ranges are extracted in worker processes while at
+    most ``max_in_flight`` ranges are pending, so memory stays flat no
+    matter how large the corpus is. Without one, pages are read serially.
+    ``page_counts`` maps each path to its page count when the caller already
+    has them, so the PDFs are not opened again to count pages.
+    """
+    page_counts = page_counts or {pdf_path: count_pages(pdf_path) for pdf_path in pdf_files}
+    if executor is None:
+        for pdf_path in pdf_files:
+            for page_num, text in _extract_page_range(str(pdf_path), 0, page_counts[pdf_path]):
+                yield pdf_path, page_num, text
+        return
+
+    tasks = (
+        (pdf_path, start, min(start + PAGES_PER_TASK, page_counts[pdf_path]))
+        for pdf_path in pdf_files
+        for start in range(0, page_counts[pdf_path], PAGES_PER_TASK)
+    )
+    pending = deque()
+    for pdf_path, start, stop in tasks:
+        pending.append((pdf_path, executor.submit(_extract_page_range, str(pdf_path), start, stop)))
+        if len(pending) >= max_in_flight:
+            yield from _drain_one(pending)
+    while pending:
+        yield from _drain_one(pending)
+
+
+def _drain_one(pending: deque) -> Iterator[tuple[Path, int, str]]:
+    pdf_path, future = pending.popleft()
+    for page_num, text in future.result():
+        yield pdf_path, page_num, text
+
+
+def load_manifest(manifest_path: Path) -> dict:
+    """Load the ingestion manifest, or return an empty one."""
+    empty = {
+        "version": MANIFEST_VERSION,
+        "revision": 0,
+        "chunker": None,
+        "embedder": None,
+        "files": {},
+    }
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return {**empty, **manifest}
+    except (OSError, ValueError):
+        pass
+    return empty
+
+
+def save_manifest(manifest: dict, manifest_path: Path) -> None:
+    """Atomically write the ingestion manifest."""
+    _write_json(manifest, manifest_path)
+
+
+def _write_json(data: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    tmp_path.replace(path)
+
+
+def build_catalog(manifest: dict) -> dict:
+    """Summarise a manifest per source, without the per-chunk entries."""
+    sources = {
+        name: {
+            "chunks": len(entry["chunks"]),
+            "pages": entry.get("pages", 0),
+            "ingested_at": entry.get("ingested_at"),
+        }
+        for name, entry in sorted(manifest["files"].items())
+    }
+    return {
+        "revision": manifest["revision"],
+        "total_chunks": sum(source["chunks"] for source in sources.values()),
+        "sources": sources,
+    }
+
+
+def iter_chunk_records(pdf_path: Path, chunks: Iterable[dict]) -> Iterator[tuple[str, dict]]:
+    """Key each chunk by a content-derived ID.
+
+    IDs are stable across runs as long as the chunk text is unchanged, so a
+    chunk that only moved to another page keeps its ID (and its embedding).
+    Identical chunks within one file get a numeric suffix.
+    """
+    seen = set()
+    for chunk in chunks:
+        base_id = f"{pdf_path.stem}_{text_sha256(chunk['text'])[:16]}"
+        chunk_id = base_id
+        n = 1
+        while chunk_id in seen:
+            chunk_id = f"{base_id}_{n}"
+            n += 1
+        seen.add(chunk_id)
+        yield chunk_id, chunk
+
+
+def _metadata(chunk: dict) -> dict:
+    return {"source": chunk["source"], "page": chunk["page"], "page_end": chunk["page_end"]}
+
+
+class _BatchWriter:
+    """Buffers collection writes and flushes them in bounded batches.
+
+    When an embedding provider is given, each batch is embedded with it in
+    one call; otherwise the collection's own embedding function is used.
+    When a sparse index is given, it receives the same changes.
+    """
+
+    def __init__(self, collection, batch_size: int, sparse_index=None, embedder=None):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.sparse_index = sparse_index
+        self.embedder = embedder
+        self.adds = []
+        self.updates = []
+
+    def add(self, chunk_id: str, chunk: dict) -> None:
+        self.adds.append((chunk_id, chunk))
+        if self.sparse_index is not None:
+            self.sparse_index.add(chunk_id, chunk["text"], _metadata(chunk))
+        if len(self.adds) >= self.batch_size:
+            self.flush()
+
+    def update(self, chunk_id: str, chunk: dict) -> None:
+        self.updates.append((chunk_id, chunk))
+        if self.sparse_index is not None:
+            self.sparse_index.update_metadata(chunk_id, _metadata(chunk))
+        if len(self.updates) >= self.batch_size:
+            self.flush()
+
+    def delete(self, chunk_ids: list[str]) -> None:
+        if self.sparse_index is not None:
+            for chunk_id in chunk_ids:
+                self.sparse_index.remove(chunk_id)
+        for i in range(0, len(chunk_ids), self.batch_size):
+            self.collection.delete(ids=chunk_ids[i:i + self.batch_size])
+
+    def flush(self) -> None:
+        if self.adds:
+            documents = [chunk["text"] for _, chunk in self.adds]
+            # upsert, not add: the manifest is saved only when the sync ends,
+            # so after a crash the next run re-writes chunks already stored
+            self.collection.upsert(
+                ids=[cid for cid, _ in self.adds],
+                documents=documents,
+                metadatas=[_metadata(chunk) for _, chunk in self.adds],
+                embeddings=self.embedder.embed(documents) if self.embedder else None,
+            )
+            self.adds = []
+        if self.updates:
+            # Same text, new metadata: no need to re-embed.
+            self.collection.update(
+                ids=[cid for cid, _ in self.updates],
+                metadatas=[_metadata(chunk) for _, chunk in self.updates],
+            )
+            self.updates = []
+
+
+def sync_documents(
+    collection,
+    pdf_files: list[Path],
+    manifest_path: Path,
+    chunker=None,
+    sparse_index=None,
+    embedder=None,
+    catalog_path: Path | None = None,
+    max_workers: int | None = None,
+    batch_size: int = WRITE_BATCH_SIZE,
+) -> dict:
+    """Bring the collection in line with the PDFs on disk.
+
+    Changed PDFs are streamed page by page through a process pool (when there
+    are enough pages to make that worthwhile), split by ``chunker`` and
+    written to Chroma in batches of ``batch_size``. Switching to a chunker
+    with a different configuration re-chunks every file; chunks whose text
+    is unchanged keep their embeddings.
+
+    Args:
+        collection: The Chroma collection to update.
+        pdf_files (list[Path]): PDFs that should be indexed.
+        manifest_path (Path): Where the ingestion manifest is stored.
+        chunker: Chunking strategy (default: ``make_chunker()``).
+        sparse_index (BM25Index | None): Keyword index to keep in step with
+            the collection.
+        embedder (EmbeddingProvider | None): Computes document embeddings;
+            defaults to the collection's embedding function.
+        catalog_path (Path | None): Where to write the per-source catalog
+            (see ``build_catalog``).
+        max_workers (int | None): Extraction processes (default: CPU count).
+        batch_size (int): Maximum number of chunks per collection write.
+
+    Returns:
+        dict: Counts of added, updated and deleted chunks, skipped files,
+            the collection revision (bumped whenever anything changed),
+            token-size statistics for the chunks produced and the catalog.
+    """
+    chunker = chunker or make_chunker()
+    if not manifest_path.exists() and collection.count() > 0:
+        # Collection was built before the manifest existed; its IDs cannot be
+        # matched to content, so start over once.
+        collection.delete(ids=collection.get(include=[])["ids"])
+
+    manifest = load_manifest(manifest_path)
+    old_files = manifest["files"]
+    new_files = {}
+    stats = {"added": 0, "updated": 0, "deleted": 0, "unchanged_files": 0}
+    chunk_stats = ChunkStats()
+    rechunk = manifest["chunker"] != chunker.signature()
+
+    changed = []
+    for pdf_path in pdf_files:
+        if not pdf_path.exists():
+            continue
+        digest = file_sha256(pdf_path)
+        entry = old_files.get(pdf_path.name)
+        if entry and entry["sha256"] == digest and not rechunk:
+            new_files[pdf_path.name] = entry
+            stats["unchanged_files"] += 1
+        else:
+            changed.append((pdf_path, digest))
+
+    writer = _BatchWriter(collection, batch_size, sparse_index, embedder)
+    ingested_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    digests = dict(changed)
+    max_workers = max_workers or os.cpu_count() or 1
+    # Counted once here and shared by the pool sizing and the page iterator
+    page_counts = {pdf_path: count_pages(pdf_path) for pdf_path in digests}
+    with _extraction_pool(sum(page_counts.values()), max_workers) as executor:
+        pages = iter_pages(
+            list(digests), executor, max_in_flight=2 * max_workers, page_counts=page_counts
+        )
+        for pdf_path, file_pages in groupby(pages, key=lambda page: page[0]):
+            entry = old_files.get(pdf_path.name)
+            old_chunks = entry["chunks"] if entry else {}
+            new_chunks = {}
+
+            chunks = chunker.chunk((page_num, text) for _, page_num, text in file_pages)
+            chunks = ({**chunk, "source": pdf_path.name} for chunk in chunks)
+            for cid, chunk in iter_chunk_records(pdf_path, chunks):
+                chunk_stats.add(chunk["n_tokens"])
+                new_chunks[cid] = _metadata(chunk)
+                if cid not in old_chunks:
+                    writer.add(cid, chunk)
+                    stats["added"] += 1
+                elif old_chunks[cid] != new_chunks[cid]:
+                    writer.update(cid, chunk)
+                    stats["updated"] += 1
+
+            to_delete = [cid for cid in old_chunks if cid not in new_chunks]
+            writer.delete(to_delete)
+            stats["deleted"] += len(to_delete)
+            new_files[pdf_path.name] = {
+                "sha256": digests[pdf_path],
+                "pages": page_counts[pdf_path],
+                "ingested_at": ingested_at,
+                "chunks": new_chunks,
+            }
+    writer.flush()
+
+    # Drop chunks belonging to PDFs that were removed from the corpus (or
+    # that no longer have any pages).
+    for name, entry in old_files.items():
+        if name not in new_files and entry["chunks"]:
+            writer.delete(list(entry["chunks"]))
+            stats["deleted"] += len(entry["chunks"])
+
+    # Changed files without any pages still get a manifest entry.
+    for pdf_path, digest in changed:
+        new_files.setdefault(pdf_path.name, {
+            "sha256": digest, "pages": 0, "ingested_at": ingested_at, "chunks": {}
+        })
+
+    if stats["added"] or stats["updated"] or stats["deleted"]:
+        manifest["revision"] += 1
+    manifest["chunker"] = chunker.signature()
+    manifest["embedder"] = embedder.signature() if embedder else None
+    manifest["files"] = new_files
+    save_manifest(manifest, manifest_path)
+    catalog = build_catalog(manifest)
+    if catalog_path:
+        _write_json(catalog, catalog_path)
+    stats["revision"] = manifest["revision"]
+    stats["catalog"] = catalog
+    stats["chunk_sizes"] = chunk_stats.summary()
+    return stats
+
+
+@contextmanager
+def _extraction_pool(total_pages: int, max_workers: int):
+    """Yield a process pool for large extractions, or None for small ones."""
+    workers = min(max_workers, -(-total_pages // PAGES_PER_TASK))
+    if total_pages < MIN_PAGES_FOR_POOL or workers < 2:
+        yield None
+        return
+    # Forking a process that runs threads (adk web, the warm-up) can deadlock;
+    # spawned workers start clean and import only this package
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        yield executor
@@ -0,0 +1,105 @@
+"""Search helpers shared by the RAG tools."""
+from .filters import chroma_where
+
+# Damping constant from the original reciprocal-rank fusion paper
+RRF_K = 60
+
+
+def search(
+    collection, queries: list[str], n_results: int, embedder=None, where: dict | None = None
+) -> list[list[dict]]:
+    """Run several queries in one vector search call.
+
+    All query texts are embedded in a single batch (by ``embedder`` if given,
+    otherwise by the collection) and searched together, so N queries cost one
+    round-trip instead of N. ``where`` is a filters.build_filter() spec that
+    Chroma applies before ranking, so filtered searches only scan matching
+    chunks.
+
+    Returns:
+        list[list[dict]]: One ranked list of hits per query, best first.
+    """
+    if embedder is not None:
+        query = {"query_embeddings": embedder.embed_queries(queries)}
+    else:
+        query = {"query_texts": queries}
+    results = collection.query(
+        **query,
+        n_results=n_results,
+        where=chroma_where(where),
+        include=["documents", "metadatas", "distances"],
+    )
+    return [
+        [
+            {
+                "id": chunk_id,
+                "content": doc,
+                "source": metadata["source"],
+                "page": metadata["page"],
+                "page_end": metadata.get("page_end", metadata["page"]),
+                "distance": distance,
+            }
+            for chunk_id, doc, metadata, distance in zip(ids, docs, metadatas, distances)
+        ]
+        for ids, docs, metadatas, distances in zip(
+            results["ids"], results["documents"], results["metadatas"], results["distances"]
+        )
+    ]
+
+
+def reciprocal_rank_fusion(ranked_lists: list[list[dict]], k: int = RRF_K) -> list[dict]:
+    """Merge ranked hit lists, scoring each hit by the sum of 1 / (k + rank).
+
+    Hits are matched by ``id`` so a chunk found by several lists appears once,
+    ranked above chunks found by only one of them.
+    """
+    fused = {}
+    for ranked in ranked_lists:
+        for rank, hit in enumerate(ranked, start=1):
+            entry = fused.setdefault(hit["id"], {"hit": hit, "score": 0.0})
+            entry["score"] += 1.0 / (k + rank)
+    merged = sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)
+    return [{**entry["hit"], "score": round(entry["score"], 6)} for entry in merged]
+
+
+def hybrid_search(
+    collection,
+    sparse_index,
+    queries: list[str],
+    n_results: int,
+    embedder=None,
+    where: dict | None = None,
+) -> list[list[dict]]:
+    """Search both the vector collection and the BM25 index.
+
+    For each query the dense and keyword rankings are merged with
+    reciprocal-rank fusion. Short lookups of an indexed identifier
+    ("HD9285", "clause 4.2") are answered from the keyword index alone when
+    it has matches, skipping the query embedding entirely. Queries that need
+    the vector search are still sent to Chroma in one batch. ``where`` (a filters.build_filter()
+    spec) restricts both searches.
+
+    Returns:
+        list[list[dict]]: One ranked list of at most ``n_results`` hits per query.
+    """
+    results = [None] * len(queries)
+    dense_positions = []
+    for i, query in enumerate(queries):
+        if sparse_index is not None and sparse_index.is_keyword_query(query):
+            sparse_hits = sparse_index.search(query, n_results, where)
+            if sparse_hits:
+                results[i] = sparse_hits
+                continue
+        dense_positions.append(i)
+
+    if dense_positions:
+        dense_lists = search(
+            collection, [queries[i] for i in dense_positions], n_results, embedder, where
+        )
+        for i, dense_hits in zip(dense_positions, dense_lists):
+            if sparse_index is None:
+                results[i] = dense_hits
+                continue
+            sparse_hits = sparse_index.search(queries[i], n_results, where)
+            results[i] = reciprocal_rank_fusion([dense_hits, sparse_hits])[:n_results]
+    return results
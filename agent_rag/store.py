@@ -0,0 +1,181 @@
+"""Lazily opened vector store (and BM25 index) for the RAG agent.
+
+Opening Chroma and syncing the PDFs is deferred until a tool first needs the
+collection, so importing the agent (for ``adk web`` or a worker process) stays
+cheap. A background warm-up can be started to do that work ahead of the first
+request, and ``is_ready`` / ``wait_until_ready`` report when it has finished.
+"""
+import json
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class VectorStore:
+    """Opens the Chroma collection and syncs the PDFs on first use.
+
+    The BM25 keyword index is loaded from ``bm25_path`` and kept in step with
+    the collection by the same sync, which also refreshes ``catalog``: the
+    per-source chunk and page counts written to ``catalog_path``. Until the
+    store is open, the catalog is answered from that file.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        collection_name: str,
+        pdf_files: list[Path],
+        manifest_path: Path,
+        description: str = "",
+        chunker=None,
+        bm25_path: Path | None = None,
+        catalog_path: Path | None = None,
+        embedder=None,
+    ):
+        self.db_path = db_path
+        self.collection_name = collection_name
+        self.pdf_files = pdf_files
+        self.manifest_path = manifest_path
+        self.description = description
+        self.chunker = chunker
+        self.bm25_path = bm25_path
+        self.sparse_index = None
+        self.catalog_path = catalog_path
+        self.catalog = None
+        self._saved_catalog = None  # from catalog_path, until the store is open
+        self.embedder = embedder
+        self._collection = None
+        self._revision = None
+        self._lock = threading.Lock()  # held for the whole open and sync
+        self._ready = threading.Event()
+        self._warmup_thread = None
+        # Separate from _lock, so starting a warm-up never waits on a sync
+        self._warmup_lock = threading.Lock()
+
+    def get_collection(self):
+        """Return the collection, opening and syncing it on the first call."""
+        if self._collection is None:
+            with self._lock:
+                if self._collection is None:
+                    self._collection = self._open()
+                    self._ready.set()
+        return self._collection
+
+    def _open(self):
+        # Imported here so that loading the agent does not pay for them.
+        import chromadb
+        from .bm25 import BM25Index
+        from .ingest import load_manifest, sync_documents
+
+        client = chromadb.PersistentClient(path=str(self.db_path))
+
+        # Vectors from different models cannot share a collection; start
+        # over when the embedding provider changes.
+        manifest = load_manifest(self.manifest_path)
+        embedder_signature = self.embedder.signature() if self.embedder else None
+        if manifest["files"] and manifest["embedder"] != embedder_signature:
+            if self.collection_name in [c.name for c in client.list_collections()]:
+                client.delete_collection(self.collection_name)
+            self.manifest_path.unlink()
+
+        collection = client.get_or_create_collection(
+            name=self.collection_name,
+            metadata={"description": self.description} if self.description else None,
+        )
+
+        sparse_index = BM25Index()
+        if self.bm25_path:
+            sparse_index = BM25Index.load(self.bm25_path)
+        # An index saved for another revision (or missing) is rebuilt from
+        # the collection after the sync instead of being patched.
+        stale = sparse_index.revision != load_manifest(self.manifest_path)["revision"]
+
+        stats = sync_documents(
+            collection,
+            self.pdf_files,
+            self.manifest_path,
+            chunker=self.chunker,
+            sparse_index=None if stale else sparse_index,
+            embedder=self.embedder,
+            catalog_path=self.catalog_path,
+        )
+        self._revision = stats["revision"]
+        self.catalog = stats["catalog"]
+
+        if stale:
+            sparse_index.rebuild(collection)
+        if stale or sparse_index.revision != stats["revision"]:
+            sparse_index.revision = stats["revision"]
+            if self.bm25_path:
+                sparse_index.save(self.bm25_path)
+        self.sparse_index = sparse_index
+        if stats["added"] or stats["updated"] or stats["deleted"]:
+            print(
+                f"Synced PDFs into ChromaDB: {stats['added']} added, "
+                f"{stats['updated']} updated, {stats['deleted']} deleted"
+            )
+        sizes = stats["chunk_sizes"]
+        if sizes["chunks"]:
+            print(
+                f"Chunk sizes (tokens) for {sizes['chunks']} chunks: "
+                f"min {sizes['min_tokens']}, mean {sizes['mean_tokens']}, "
+                f"p50 {sizes['p50_tokens']}, p95 {sizes['p95_tokens']}, max {sizes['max_tokens']}"
+            )
+        return collection
+
+    def _load_catalog(self) -> dict | None:
+        if not self.catalog_path or not self.catalog_path.exists():
+            return None
+        try:
+            return json.loads(self.catalog_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def get_catalog(self) -> dict:
+        """Return the per-source catalog.
+
+        Before the store is open this is the catalog saved by the last sync,
+        read without opening Chroma or reading the PDFs; the warm-up is
+        started so that later calls reflect a fresh sync. Without a saved
+        catalog the store is opened first.
+        """
+        if not self.is_ready():
+            if self._saved_catalog is None:
+                self._saved_catalog = self._load_catalog()
+            if self._saved_catalog is not None:
+                self.start_warmup()
+                return self._saved_catalog
+        self.get_collection()
+        return self.catalog
+
+    @property
+    def version(self):
+        """Revision of the indexed content; changes whenever a sync edits it."""
+        return self._revision
+
+    def is_ready(self) -> bool:
+        """Whether the collection is open and in sync with the PDFs."""
+        return self._ready.is_set()
+
+    def wait_until_ready(self, timeout: float | None = None) -> bool:
+        """Block until the store is ready; returns False on timeout."""
+        return self._ready.wait(timeout)
+
+    def start_warmup(self) -> threading.Thread:
+        """Open and sync the store in a background thread (idempotent)."""
+        with self._warmup_lock:
+            if self._warmup_thread is None:
+                self._warmup_thread = threading.Thread(
+                    target=self._warmup, name="rag-store-warmup", daemon=True
+                )
+                self._warmup_thread.start()
+        return self._warmup_thread
+
+    def _warmup(self) -> None:
+        try:
+            self.get_collection()
+        except Exception:
+            # The next tool call retries and reports the error to the model.
+            logger.exception("Vector store warm-up failed")
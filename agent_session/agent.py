@@ -1,5 +1,4 @@
 import os
-import requests
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -7,71 +6,18 @@ from dotenv import load_dotenv
 env_path = Path(__file__).parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
-from tavily import TavilyClient
+from shared_tools.aio import get_weather, tavily_search
+from shared_tools.compaction import HistoryCompactor
+from shared_tools.sessions import get_or_create_session, make_session_service
+from shared_tools.tracing import TurnTracer
 from google.adk.agents import Agent
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 from google.genai import types
 
-OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
-TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
-
-
-# --- Tools ---
-def get_weather(city: str) -> dict:
-    """Retrieves the current weather and temperature for a specified city.
-
-    Args:
-        city (str): The name of the city.
-
-    Returns:
-        dict: status and result or error msg.
-    """
-    if not OPENWEATHER_API_KEY:
-        return {"status": "error", "error_message": "OpenWeather API key not configured."}
-
-    base_url = "http://api.openweathermap.org/data/2.5/weather"
-    complete_url = f"{base_url}?q={city}&appid={OPENWEATHER_API_KEY}&units=metric"
-
-    try:
-        response = requests.get(complete_url)
-        data = response.json()
-
-        if response.status_code != 200:
-            return {"status": "error", "error_message": data.get("message", "Failed to fetch weather.")}
-
-        weather_description = data["weather"][0]["description"]
-        temperature = data["main"]["temp"]
-        return {
-            "status": "success",
-            "report": f"The current weather in {city} is {weather_description} with a temperature of {temperature}°C.",
-        }
-    except Exception as e:
-        return {"status": "error", "error_message": str(e)}
-
-
-def tavily_search(query: str) -> dict:
-    """Searches the web for information using Tavily.
-
-    Args:
-        query (str): The search query.
-
-    Returns:
-        dict: status and search results or error msg.
-    """
-    if not TAVILY_API_KEY:
-        return {"status": "error", "error_message": "Tavily API key not configured."}
-
-    try:
-        tavily = TavilyClient(api_key=TAVILY_API_KEY)
-        response = tavily.search(query=query, search_depth="basic")
-
-        results = response.get("results", [])
-        summary = "\n".join([f"Source: {res['url']}\nContent: {res['content']}" for res in results])
-        return {"status": "success", "report": summary}
-    except Exception as e:
-        return {"status": "error", "error_message": str(e)}
-
+# --- History Compaction ---
+# Older turns are summarized once the history passes HISTORY_TOKEN_BUDGET tokens,
+# so long chats don't make every model call slower
+history_compactor = HistoryCompactor(keep_turns=3)
 
 # --- Agent Definition ---
 root_agent = Agent(
@@ -83,11 +29,13 @@ root_agent = Agent(
         "Use get_weather for weather/temperature questions. "
         "Use tavily_search to search the web for any other questions like news, people, events, facts, etc."
     ),
-    tools=[get_weather, tavily_search]
+    tools=[get_weather, tavily_search],
+    before_model_callback=history_compactor.before_model_callback,
 )
 
 # --- Session Management ---
-session_service = InMemorySessionService()
+# In memory by default; set SESSION_DB=sessions.db to keep sessions across runs
+session_service = make_session_service()
 
 APP_NAME = "assistant_app"
 USER_ID = "user_1"
@@ -95,21 +43,21 @@ SESSION_ID = "session_001"
 
 
 async def setup_session():
-    """Create the specific session where the conversation will happen."""
-    session = await session_service.create_session(
-        app_name=APP_NAME,
-        user_id=USER_ID,
-        session_id=SESSION_ID
-    )
-    print(f"Session created: App='{APP_NAME}', User='{USER_ID}', Session='{SESSION_ID}'")
+    """Create the session where the conversation will happen, or resume it."""
+    session = await get_or_create_session(session_service, APP_NAME, USER_ID, SESSION_ID)
+    print(f"Session ready: App='{APP_NAME}', User='{USER_ID}', Session='{SESSION_ID}' ({len(session.events)} events)")
     return session
 
 
+# Per-turn timings; set TRACE_FILE to write them out (TRACE_FORMAT: "chrome" or "otlp")
+tracer = TurnTracer(service_name=APP_NAME)
+
 # --- Runner ---
 runner = Runner(
     agent=root_agent,
     app_name=APP_NAME,
-    session_service=session_service
+    session_service=session_service,
+    plugins=[tracer.plugin],  # times each tool call
 )
 print(f"Runner created for agent '{runner.agent.name}'.")
 
@@ -120,10 +68,14 @@ async def call_agent_async(query):
     await setup_session()
     events = runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=content)
 
-    async for event in events:
+    async for event in tracer.trace(events, query=query):
         if event.is_final_response():
             final_response = event.content.parts[0].text
             print("Agent Response: ", final_response)
+    print(tracer.format_summary())
+    print(history_compactor.format_last())
+    if os.getenv("TRACE_FILE"):
+        tracer.export(Path(os.environ["TRACE_FILE"]), os.getenv("TRACE_FORMAT", "chrome"))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,202 @@
+"""Per-turn latency and throughput benchmarks for the example agents.
+
+Each agent runs in a fresh process against StubLlm (see stub.py), or against
+recorded cassettes when ``--cassette-dir`` holds one for it. ``--sessions``
+concurrent sessions each play the agent's scripted conversation
+``--rounds`` times. Results go to a JSON file for comparing runs, e.g.
+before and after an ADK upgrade.
+
+Run from the repo root::
+
+    python -m benchmarks.run
+    python -m benchmarks.run --agents basic multi_tools --sessions 50 --model-latency 0.2
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import mean
+
+from .scenarios import SCENARIOS
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Placeholder keys; some agents refuse to import without them
+STUB_ENV = ("GOOGLE_API_KEY", "TAVILY_API_KEY", "OPENWEATHER_API_KEY")
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def _run_turn(runner, session_id: str, message: str) -> dict:
+    from google.genai import types
+
+    content = types.Content(role="user", parts=[types.Part(text=message)])
+    events = 0
+    tool_calls = 0
+    start = time.perf_counter()
+    async for event in runner.run_async(user_id="bench", session_id=session_id, new_message=content):
+        events += 1
+        tool_calls += len(event.get_function_calls())
+    return {"latency": time.perf_counter() - start, "events": events, "tool_calls": tool_calls}
+
+
+async def _run_session(runner, app_name: str, script: list[str], rounds: int) -> list[dict]:
+    session = await runner.session_service.create_session(app_name=app_name, user_id="bench")
+    turns = []
+    for _ in range(rounds):
+        for message in script:
+            turns.append(await _run_turn(runner, session.id, message))
+    return turns
+
+
+async def bench_agent(name: str, options: dict) -> dict:
+    """Benchmark one agent in this process.
+
+    Returns:
+        dict: Throughput, latency percentiles (ms), per-turn averages and
+        peak RSS.
+    """
+    from google.adk.runners import InMemoryRunner
+
+    from shared_tools.replay import Cassette, install
+
+    from .stub import StubToolsPlugin, install_stub
+
+    for key in STUB_ENV:
+        os.environ.setdefault(key, "stub")
+    package, script = SCENARIOS[name]
+    root_agent = importlib.import_module(f"{package}.agent").root_agent
+
+    cassette_path = Path(options["cassette_dir"] or "") / f"{name}.jsonl"
+    if options["cassette_dir"] and cassette_path.exists():
+        mode = "replay"
+        plugins = [install(root_agent, Cassette(cassette_path, mode="replay"))]
+    else:
+        mode = "stub"
+        install_stub(root_agent, latency=options["model_latency"])
+        plugins = [] if options["real_tools"] else [StubToolsPlugin()]
+
+    runner = InMemoryRunner(agent=root_agent, app_name=name, plugins=plugins)
+    # Untimed warm-up: imports, lazy clients, first-call setup
+    await _run_session(runner, name, script, 1)
+
+    start = time.perf_counter()
+    sessions = await asyncio.gather(*[
+        _run_session(runner, name, script, options["rounds"])
+        for _ in range(options["sessions"])
+    ])
+    wall = time.perf_counter() - start
+    await runner.close()
+
+    turns = [turn for session in sessions for turn in session]
+    latencies = sorted(turn["latency"] * 1000 for turn in turns)
+    return {
+        "agent": package,
+        "mode": mode,
+        "turns": len(turns),
+        "wall_s": round(wall, 3),
+        "turns_per_s": round(len(turns) / wall, 1),
+        "latency_ms": {
+            "mean": round(mean(latencies), 2),
+            "p50": round(_percentile(latencies, 0.50), 2),
+            "p95": round(_percentile(latencies, 0.95), 2),
+            "p99": round(_percentile(latencies, 0.99), 2),
+            "max": round(latencies[-1], 2),
+        },
+        "events_per_turn": round(mean(turn["events"] for turn in turns), 2),
+        "tool_calls_per_turn": round(mean(turn["tool_calls"] for turn in turns), 2),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _bench_in_process(name: str, options: dict) -> dict:
+    import contextlib
+    import logging
+    import warnings
+
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.WARNING)
+    # Agents' own print() tracing would bury the results table
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return asyncio.run(bench_agent(name, options))
+
+
+def _metadata(options: dict) -> dict:
+    from importlib.metadata import version
+
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "google_adk": version("google-adk"),
+        "options": options,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the example agents against a stub model.")
+    parser.add_argument("--agents", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent sessions per agent")
+    parser.add_argument("--rounds", type=int, default=5, help="Times each session repeats its script")
+    parser.add_argument("--model-latency", type=float, default=0.0,
+                        help="Seconds each stub model call sleeps (0 measures framework overhead only)")
+    parser.add_argument("--real-tools", action="store_true",
+                        help="Run the agents' real tools instead of canned results (needs API keys)")
+    parser.add_argument("--cassette-dir", type=Path,
+                        help="Replay <dir>/<agent>.jsonl cassettes (shared_tools.replay) where present")
+    parser.add_argument("--output", type=Path, help="JSON file for the results")
+    args = parser.parse_args(argv)
+
+    options = {
+        "sessions": args.sessions,
+        "rounds": args.rounds,
+        "model_latency": args.model_latency,
+        "real_tools": args.real_tools,
+        "cassette_dir": str(args.cassette_dir) if args.cassette_dir else None,
+    }
+    report = {"meta": _metadata(options), "results": {}}
+
+    print(f"{'agent':<12} {'mode':<7} {'turns/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'events':>7} {'tools':>6} {'rss MB':>7}")
+    spawn = multiprocessing.get_context("spawn")
+    for name in args.agents:
+        # A fresh process per agent keeps peak RSS and imports separate
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            try:
+                result = pool.submit(_bench_in_process, name, options).result()
+            except Exception as e:
+                result = {"error": f"{type(e).__name__}: {e}"}
+        report["results"][name] = result
+        if "error" in result:
+            print(f"{name:<12} error: {result['error']}")
+            continue
+        latency = result["latency_ms"]
+        print(f"{name:<12} {result['mode']:<7} {result['turns_per_s']:>9} {latency['p50']:>8} "
+              f"{latency['p95']:>8} {latency['p99']:>8} {result['events_per_turn']:>7} "
+              f"{result['tool_calls_per_turn']:>6} {result['peak_rss_mb']:>7}")
+
+    output = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
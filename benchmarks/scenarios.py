@@ -0,0 +1,60 @@
+"""Scripted conversations, one per example agent.
+
+Each entry maps a benchmark name to the agent package and the user messages
+sent, in order, within one session.
+"""
+
+SCENARIOS = {
+    "basic": ("basic_agent", [
+        "Hi, how do I activate my new debit card?",
+        "What should I do if my card is lost?",
+        "Can I set up a recurring payment online?",
+        "Thanks, that's all.",
+    ]),
+    "multi_tools": ("multi_tools_agent", [
+        "What's the weather in Singapore?",
+        "Any news about the Singapore Grand Prix?",
+        "And the weather in Tokyo?",
+        "Who won the last Formula 1 race?",
+    ]),
+    "guardrail": ("agent_guardrail", [
+        "What's the weather in London?",
+        "BLOCK this request please",
+        "Search for the latest ADK release notes.",
+        "What's the weather in Paris?",
+    ]),
+    "handoff": ("agent_handoff", [
+        "Tell me a joke about cats.",
+        "Another one about programmers, please.",
+        "Hello there!",
+        "One more joke about coffee.",
+    ]),
+    "travel": ("travel_agent", [
+        "Plan a 3-day trip to Kyoto.",
+        "What would that cost for two people?",
+        "Where should we eat?",
+        "Are there any travel advisories for Japan right now?",
+    ]),
+    "tutor": ("tutor_agent", [
+        "How do I solve 2x + 3 = 11?",
+        "Why does ice float on water?",
+        "What caused the fall of the Roman Empire?",
+        "Can you explain derivatives simply?",
+    ]),
+    "stock": ("stock_agent", [
+        "Hi, I'd like to analyse a stock.",
+        "NVDA",
+        "What about GOOG?",
+    ]),
+    "transport": ("transport_agent", [
+        "Hello, I need a route.",
+        "From Jurong East to Changi Airport.",
+        "What if I take a taxi instead?",
+    ]),
+    "rag": ("agent_rag", [
+        "How long is the warranty?",
+        "How do I clean the basket?",
+        "What temperature should I use for fries?",
+        "Is water damage covered by the warranty?",
+    ]),
+}
@@ -0,0 +1,147 @@
+"""Local stand-ins for Gemini and the network tools.
+
+StubLlm follows a fixed policy so every agent does realistic work per turn
+without a real model:
+
+1. On a new user message, call every function tool the agent has (with
+   arguments made up from the tool's declaration), or, if it has no tools
+   but has sub-agents, transfer to one of them.
+2. Once anything has happened since the user message (tool results, a
+   transfer), answer with text.
+
+So each turn costs at most one tool round and one transfer, and the numbers
+measure the Runner, sessions and tool dispatch rather than a model.
+"""
+import asyncio
+import zlib
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.genai import types
+
+from shared_tools.agents import iter_agents
+from shared_tools.compaction import CHARS_PER_TOKEN, is_user_message
+from shared_tools.replay import intercepts_tool
+
+
+def _stub_args(declaration: types.FunctionDeclaration, user_text: str) -> dict:
+    """Fill every required parameter with a plausible value."""
+    schema = declaration.parameters
+    if schema is None or not schema.properties:
+        return {}
+    values = {
+        types.Type.STRING: user_text,
+        types.Type.INTEGER: 1,
+        types.Type.NUMBER: 1.0,
+        types.Type.BOOLEAN: False,
+        types.Type.ARRAY: [user_text],
+        types.Type.OBJECT: {},
+    }
+    return {
+        name: values.get(schema.properties[name].type, user_text)
+        for name in schema.required or []
+    }
+
+
+class StubLlm(BaseLlm):
+    """Deterministic model standing in for one agent's Gemini model.
+
+    ``model`` keeps the real model name, so tools that check it (e.g.
+    google_search) still accept the request.
+    """
+
+    agent_name: str
+    sub_agent_names: list[str] = []
+    latency: float = 0.0
+    reply_tokens: int = 60
+
+    def _reply(self, parts: list[types.Part], llm_request: LlmRequest) -> LlmResponse:
+        prompt_chars = sum(
+            len(part.text or "")
+            for content in llm_request.contents
+            for part in content.parts or []
+        )
+        return LlmResponse(
+            content=types.Content(role="model", parts=parts),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_chars // CHARS_PER_TOKEN,
+                candidates_token_count=self.reply_tokens if parts[0].text else 10,
+            ),
+        )
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        contents = llm_request.contents
+        last_user = max(
+            (i for i, content in enumerate(contents) if is_user_message(content)), default=-1
+        )
+        user_text = contents[last_user].parts[0].text if last_user >= 0 else ""
+        fresh_turn = last_user == len(contents) - 1
+
+        if fresh_turn:
+            tools = [
+                tool for name, tool in llm_request.tools_dict.items()
+                if name != "transfer_to_agent"
+            ]
+            if tools:
+                calls = [
+                    types.Part(function_call=types.FunctionCall(
+                        name=tool.name, args=_stub_args(tool._get_declaration(), user_text)
+                    ))
+                    for tool in tools
+                ]
+                yield self._reply(calls, llm_request)
+                return
+            if self.sub_agent_names and "transfer_to_agent" in llm_request.tools_dict:
+                # Spread different messages over different sub-agents
+                target = self.sub_agent_names[
+                    zlib.crc32(user_text.encode("utf-8")) % len(self.sub_agent_names)
+                ]
+                call = types.FunctionCall(name="transfer_to_agent", args={"agent_name": target})
+                yield self._reply([types.Part(function_call=call)], llm_request)
+                return
+
+        words = " ".join(["lorem"] * self.reply_tokens)
+        text = f"[{self.agent_name}] {user_text[:40]}: {words}"
+        yield self._reply([types.Part(text=text)], llm_request)
+
+
+class StubToolsPlugin(BasePlugin):
+    """Runner plugin answering every external tool call with a canned result."""
+
+    def __init__(self):
+        super().__init__(name="stub_tools")
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context) -> Optional[dict]:
+        if not intercepts_tool(tool):
+            return None
+        return {"status": "success", "report": f"Stub result from {tool.name} for {tool_args}."}
+
+
+def install_stub(root_agent, latency: float = 0.0, reply_tokens: int = 60) -> None:
+    """Replace the model of every LlmAgent in ``root_agent``'s tree with a StubLlm.
+
+    Args:
+        root_agent: The agent to benchmark; modified in place.
+        latency (float): Seconds each model call sleeps, to mimic a real
+            model's round trip.
+        reply_tokens (int): Words in each text reply.
+    """
+    llm_agents = [agent for agent in iter_agents(root_agent) if isinstance(agent, LlmAgent)]
+    models = [agent.canonical_model for agent in llm_agents]
+    for agent, model in zip(llm_agents, models):
+        agent.model = StubLlm(
+            model=model.model,
+            agent_name=agent.name,
+            sub_agent_names=[sub_agent.name for sub_agent in agent.sub_agents],
+            latency=latency,
+            reply_tokens=reply_tokens,
+        )
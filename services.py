@@ -0,0 +1,24 @@
+"""Custom services for `adk web` / `adk api_server` run from this folder.
+
+ADK imports this file at startup. It registers the ``sqlitewal`` session
+scheme, so several workers can share durable sessions::
+
+    adk web --session_service_uri sqlitewal:///sessions.db
+"""
+from urllib.parse import urlparse
+
+from google.adk.cli.service_registry import get_service_registry
+
+from shared_tools.sessions import BatchedSqliteSessionService
+
+
+def batched_sqlite_session_factory(uri: str, **kwargs):
+    # Same path rules as ADK's sqlite:// scheme: sqlitewal:///relative.db
+    # or sqlitewal:////absolute/path.db
+    db_path = urlparse(uri).path
+    if db_path.startswith("/"):
+        db_path = db_path[1:]
+    return BatchedSqliteSessionService(db_path or "sessions.db")
+
+
+get_service_registry().register_session_service("sqlitewal", batched_sqlite_session_factory)
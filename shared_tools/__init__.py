@@ -0,0 +1,4 @@
+from .executor import ToolExecutor
+from .offload import run_in_thread
+from .search import search_cache_stats, tavily_search
+from .weather import get_weather, get_weather_async, weather_cache_stats
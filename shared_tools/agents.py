@@ -0,0 +1,12 @@
+"""Helpers for walking an agent tree."""
+from google.adk.tools.agent_tool import AgentTool
+
+
+def iter_agents(agent):
+    """Yield ``agent`` and every agent below it, including AgentTool agents."""
+    yield agent
+    for sub_agent in agent.sub_agents:
+        yield from iter_agents(sub_agent)
+    for tool in getattr(agent, "tools", []):
+        if isinstance(tool, AgentTool):
+            yield from iter_agents(tool.agent)
@@ -0,0 +1,23 @@
+"""Non-blocking versions of the shared tools, under the same tool names.
+
+Agents switch by import path (``from shared_tools.aio import get_weather``)
+and the model sees identical tool declarations. get_weather is native async
+over the pooled httpx client; tavily_search runs on the tool thread pool.
+"""
+from .offload import run_in_thread
+from .search import tavily_search as _tavily_search
+from .weather import get_weather_async
+
+tavily_search = run_in_thread(_tavily_search)
+
+
+async def get_weather(city: str) -> dict:
+    """Retrieves the current weather and temperature for a specified city.
+
+    Args:
+        city (str): The name of the city.
+
+    Returns:
+        dict: status and result or error msg.
+    """
+    return await get_weather_async(city)
@@ -0,0 +1,134 @@
+"""Bounded TTL cache with request coalescing ("single flight").
+
+When several callers miss on the same key at once, only the first runs the
+loader; the others wait for its result instead of firing identical upstream
+requests. Works for both threads (``get_or_load``) and coroutines
+(``get_or_load_async``).
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class TTLCache:
+    """LRU cache whose entries expire ``ttl`` seconds after they are stored.
+
+    Args:
+        maxsize (int): Entries kept before the least recently used is evicted.
+        ttl (float): Seconds an entry stays fresh.
+        cacheable: Predicate deciding whether a loaded value is stored
+            (e.g. skip error responses). Every value is stored by default.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0, cacheable=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.cacheable = cacheable or (lambda value: True)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._in_flight = {}  # key -> Future (threads) or (loop, key) -> asyncio.Task
+        self._lock = threading.Lock()
+
+    def _lookup(self, key):
+        """Return (True, value) for a fresh entry, else (False, None). Hold the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[1]
+
+    def _store(self, key, value) -> None:
+        if not self.cacheable(value):
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for ``key``, calling ``loader()`` on a miss."""
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                self.misses += 1
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+
+        try:
+            value = loader()
+            self._store(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    async def get_or_load_async(self, key, loader):
+        """Return the cached value for ``key``, awaiting ``loader()`` on a miss."""
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            task = self._in_flight.get(flight_key)
+            if task is None:
+                self.misses += 1
+                task = self._in_flight[flight_key] = loop.create_task(self._load_async(flight_key, loader))
+                # Nobody may be left to read a failure once every caller is cancelled
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            else:
+                self.coalesced += 1
+        # The load runs in its own task and every caller shields it, so a
+        # cancelled caller (timeout, disconnect) neither cancels the load nor
+        # fails the other callers waiting on it
+        return await asyncio.shield(task)
+
+    async def _load_async(self, flight_key, loader):
+        try:
+            value = await loader()
+            self._store(flight_key[1], value)
+            return value
+        finally:
+            with self._lock:
+                self._in_flight.pop(flight_key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit, miss and coalescing counters plus the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
@@ -0,0 +1,179 @@
+"""Keep the history sent to the model within a token budget.
+
+ADK replays a session's whole event list into every model call, so prompt
+size (and latency and cost) grows with every turn. ``HistoryCompactor``
+is a ``before_model_callback`` that, once the history is over budget:
+
+- keeps the last ``keep_turns`` turns (the current one included) verbatim;
+- folds older turns into one summary message, newest first while the budget
+  lasts: each user message and answer shortened to a line, tool results
+  kept verbatim, or noted as omitted when even that would not fit;
+- drops the oldest turns entirely once nothing more fits.
+
+Only the model request is changed; the session keeps every event. Tokens are
+estimated at 4 characters each, which is close enough for a budget.
+"""
+import json
+import os
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+# Prompt tokens the conversation history may use (system instruction excluded)
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "4000"))
+KEEP_TURNS = 3
+CHARS_PER_TOKEN = 4
+# Longest user message or answer kept in a summary line
+SUMMARY_LINE_CHARS = 300
+
+# Prefix ADK puts on other agents' events when showing them to a model
+FOREIGN_EVENT_PREFIX = "For context:"
+
+
+def _part_chars(part: types.Part) -> int:
+    if part.text:
+        return len(part.text)
+    if part.function_call:
+        return len(part.function_call.name or "") + len(json.dumps(part.function_call.args or {}, default=str))
+    if part.function_response:
+        return len(json.dumps(part.function_response.response or {}, default=str))
+    return 0
+
+
+def estimate_tokens(contents: list[types.Content]) -> int:
+    """Rough token count of a list of contents."""
+    chars = sum(_part_chars(part) for content in contents for part in content.parts or [])
+    return chars // CHARS_PER_TOKEN
+
+
+def is_user_message(content: types.Content) -> bool:
+    """True for a message typed by the user, as opposed to tool results or context."""
+    if content.role != "user" or not content.parts:
+        return False
+    text = content.parts[0].text
+    return text is not None and not text.startswith(FOREIGN_EVENT_PREFIX)
+
+
+def _shorten(text: str, limit: int = SUMMARY_LINE_CHARS) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit].rsplit(" ", 1)[0] + "..."
+
+
+def _summarize_turn(turn: list[types.Content], with_results: bool) -> list[str]:
+    """One line per message and tool result of a past turn."""
+    lines = []
+    calls = {}  # function call id -> "name(args)"
+    for content in turn:
+        for part in content.parts or []:
+            if part.function_call:
+                call = part.function_call
+                calls[call.id] = f"{call.name}({json.dumps(call.args or {}, default=str)})"
+            elif part.function_response:
+                response = part.function_response
+                call = calls.get(response.id, f"{response.name}()")
+                if with_results:
+                    lines.append(f"  Tool {call} returned: {json.dumps(response.response or {}, default=str)}")
+                else:
+                    lines.append(f"  Tool {call} was called (result omitted)")
+            elif part.text and not part.thought:
+                if is_user_message(content):
+                    lines.append(f"- User: {_shorten(part.text)}")
+                else:
+                    # Model answers, and other agents' replies relayed "For context:"
+                    lines.append(f"  Assistant: {_shorten(part.text.removeprefix(FOREIGN_EVENT_PREFIX))}")
+    return lines
+
+
+class HistoryCompactor:
+    """``before_model_callback`` bounding the history sent to the model.
+
+    Attach with ``Agent(..., before_model_callback=compactor.before_model_callback)``.
+
+    Args:
+        max_tokens (int): Token budget for the history in each model call.
+        keep_turns (int): Most recent turns, the current one included, that
+            are always sent verbatim.
+    """
+
+    def __init__(self, max_tokens: int = HISTORY_TOKEN_BUDGET, keep_turns: int = KEEP_TURNS):
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self.last = {"tokens_before": 0, "tokens_after": 0, "turns_compacted": 0}
+        self._totals = {"model_calls": 0, "compacted_calls": 0, "tokens_before": 0, "tokens_after": 0}
+
+    def compact(self, contents: list[types.Content]) -> tuple[list[types.Content], int]:
+        """Fit ``contents`` into the budget.
+
+        Returns:
+            tuple: The contents to send and how many turns were folded into
+            the summary or dropped.
+        """
+        if estimate_tokens(contents) <= self.max_tokens:
+            return contents, 0
+
+        # Split into turns, each starting at a message from the user
+        turns = []
+        for content in contents:
+            if is_user_message(content) or not turns:
+                turns.append([])
+            turns[-1].append(content)
+        if len(turns) <= self.keep_turns:
+            return contents, 0
+
+        older, recent = turns[:-self.keep_turns], turns[-self.keep_turns:]
+        recent_contents = [content for turn in recent for content in turn]
+        budget = (self.max_tokens - estimate_tokens(recent_contents)) * CHARS_PER_TOKEN
+
+        kept = []  # summary lines per turn, newest first
+        for turn in reversed(older):
+            lines = _summarize_turn(turn, with_results=True)
+            if sum(len(line) + 1 for line in lines) > budget:
+                lines = _summarize_turn(turn, with_results=False)
+            cost = sum(len(line) + 1 for line in lines)
+            if cost > budget:
+                break
+            kept.append(lines)
+            budget -= cost
+
+        header = f"{FOREIGN_EVENT_PREFIX} summary of the earlier conversation."
+        dropped = len(older) - len(kept)
+        if dropped:
+            header += f" {dropped} earlier turns are no longer shown."
+        summary_lines = [header] + [line for lines in reversed(kept) for line in lines]
+        summary = types.Content(role="user", parts=[types.Part(text="\n".join(summary_lines))])
+        return [summary] + recent_contents, len(older)
+
+    def before_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        """Replace the request's history with its compacted form."""
+        before = estimate_tokens(llm_request.contents)
+        llm_request.contents, turns_compacted = self.compact(llm_request.contents)
+        after = estimate_tokens(llm_request.contents) if turns_compacted else before
+
+        self.last = {"tokens_before": before, "tokens_after": after, "turns_compacted": turns_compacted}
+        self._totals["model_calls"] += 1
+        self._totals["compacted_calls"] += bool(turns_compacted)
+        self._totals["tokens_before"] += before
+        self._totals["tokens_after"] += after
+        return None  # let the model call proceed
+
+    def stats(self) -> dict:
+        """Token counts before and after compaction, summed over all model calls."""
+        totals = dict(self._totals)
+        before = totals["tokens_before"]
+        totals["tokens_saved"] = before - totals["tokens_after"]
+        totals["saved_ratio"] = round(totals["tokens_saved"] / before, 3) if before else 0.0
+        return totals
+
+    def format_last(self) -> str:
+        last = self.last
+        if not last["turns_compacted"]:
+            return f"History: {last['tokens_before']} tokens (within budget of {self.max_tokens})"
+        return (
+            f"History: {last['tokens_before']} -> {last['tokens_after']} tokens "
+            f"({last['turns_compacted']} older turns compacted, budget {self.max_tokens})"
+        )
@@ -0,0 +1,84 @@
+"""Concurrency limit, timeout and error isolation for tool calls.
+
+When the model asks for several function calls in one response, ADK starts
+each as its own task and gathers them, so async tools already overlap. What
+is missing is a bound on how many run at once, a per-call timeout, and
+isolation: one call raising fails the whole gather and the results of the
+calls that did succeed are lost. ``ToolExecutor.wrap`` adds all three around
+an existing tool function.
+"""
+import asyncio
+import functools
+import inspect
+import threading
+import weakref
+
+from .offload import run_in_thread
+
+
+class ToolExecutor:
+    """Runs the tools it wraps with at most ``max_concurrency`` calls at once.
+
+    Args:
+        max_concurrency (int): Calls allowed to run at once per event loop;
+            further calls wait for a slot.
+        timeout (float): Seconds a call may run (after getting a slot)
+            before it is abandoned and reported as an error.
+    """
+
+    def __init__(self, max_concurrency: int = 8, timeout: float = 15.0):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+        self._semaphores = weakref.WeakKeyDictionary()  # event loop -> Semaphore
+        self._lock = threading.Lock()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Semaphores are bound to the loop that created them; keep one per loop
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+            return semaphore
+
+    def wrap(self, func):
+        """Return ``func`` as a bounded, time-limited coroutine function.
+
+        Synchronous tools are moved to the tool thread pool (see offload.py).
+        A timeout or exception becomes a ``{"status": "error"}`` result, so
+        the other calls of the same turn still reach the model. The name,
+        docstring and signature of ``func`` are kept.
+
+        Args:
+            func: Tool function, sync or async.
+
+        Returns:
+            The wrapped coroutine function.
+        """
+        call = func if inspect.iscoroutinefunction(func) else run_in_thread(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            async with self._semaphore():
+                self.calls += 1
+                try:
+                    # A timed-out thread keeps running; only the wait is abandoned
+                    return await asyncio.wait_for(call(*args, **kwargs), self.timeout)
+                except TimeoutError:
+                    self.timeouts += 1
+                    return {
+                        "status": "error",
+                        "error_message": f"{func.__name__} timed out after {self.timeout:g}s.",
+                    }
+                except Exception as e:
+                    self.errors += 1
+                    return {"status": "error", "error_message": str(e)}
+
+        return wrapper
+
+    def stats(self) -> dict:
+        """Call, timeout and error counters."""
+        return {"calls": self.calls, "timeouts": self.timeouts, "errors": self.errors}
@@ -0,0 +1,98 @@
+"""Pooled HTTP clients shared by the tools.
+
+Every tool call used to open its own connection with a bare ``requests.get``
+and no timeout. These helpers reuse one keep-alive connection pool per
+process (sync) or per event loop (async), bound the number of connections,
+always apply a timeout and retry transient failures with exponential backoff.
+"""
+import asyncio
+import random
+import threading
+import weakref
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeout in seconds for every request
+DEFAULT_TIMEOUT = (3.05, 10.0)
+
+# Connections kept open per host
+POOL_MAXSIZE = 20
+
+# Attempts after the first one for connection errors, 429 and 5xx responses
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.3
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> httpx.AsyncClient
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide requests session."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total=MAX_RETRIES,
+                    backoff_factor=BACKOFF_FACTOR,
+                    status_forcelist=RETRY_STATUSES,
+                    allowed_methods=["GET"],
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=10, pool_maxsize=POOL_MAXSIZE, max_retries=retry
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def get(url: str, params: dict | None = None, timeout=DEFAULT_TIMEOUT) -> requests.Response:
+    """GET through the shared session, with a timeout and retries."""
+    return get_session().get(url, params=params, timeout=timeout)
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the httpx client for the running event loop.
+
+    httpx connections belong to the loop that opened them, so each loop gets
+    its own pooled client.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        connect, read = DEFAULT_TIMEOUT
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read, connect=connect),
+            limits=httpx.Limits(
+                max_connections=POOL_MAXSIZE, max_keepalive_connections=POOL_MAXSIZE
+            ),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def get_async(url: str, params: dict | None = None) -> httpx.Response:
+    """GET through the loop's shared client, retrying with backoff.
+
+    Connection errors, timeouts and retryable statuses are retried up to
+    MAX_RETRIES times; the last response (or error) is returned (or raised).
+    """
+    client = get_async_client()
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = await client.get(url, params=params)
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                return response
+        except httpx.TransportError:
+            if attempt == MAX_RETRIES:
+                raise
+        # Exponential backoff with jitter, as urllib3's Retry does for sync calls
+        await asyncio.sleep(BACKOFF_FACTOR * (2 ** attempt) * random.uniform(0.5, 1.5))
@@ -0,0 +1,341 @@
+"""A long-lived MCP connection with a cached tool list.
+
+Opening an ``McpToolset`` per query pays for the transport handshake, the
+MCP ``initialize`` exchange and a ``list_tools`` round trip every time.
+``McpConnection`` is an ``McpToolset`` that instead:
+
+- keeps one session open; a background task pings the server every
+  ``health_interval`` seconds, which also keeps idle connections from being
+  closed by proxies, replaces a lost session at once, and retries failed
+  connects with exponential backoff and jitter;
+- discovers the tools once and keeps them, optionally in a JSON file
+  (``cache_path``) with an ETag (a hash of the tool definitions). With a
+  cache, startup and the first query need no ``list_tools`` round trip, and
+  ``Agent(tools=[connection])`` can be built at import, for ``adk web`` too;
+- lists the tools again in the background when the server sends
+  ``notifications/tools/list_changed``, after a reconnect, or once the list
+  is older than ``refresh_interval``.
+
+The tools fetch the live session on every call, and wait while it is being
+reopened, so they stay valid across reconnects. Use one instance per server and event loop, and
+``close()`` it on shutdown (``Runner.close()`` does).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from pathlib import Path
+from typing import Optional
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.mcp_tool import McpTool, McpToolset
+from mcp import types
+
+logger = logging.getLogger(__name__)
+
+HEALTH_INTERVAL = 30.0
+PING_TIMEOUT = 5.0
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+# Cached tools older than this are listed again in the background
+REFRESH_INTERVAL = 3600.0
+# Bump when the cache file layout changes; older files are ignored
+CACHE_VERSION = 1
+
+
+def _etag(tool_dicts: list[dict]) -> str:
+    data = json.dumps(tool_dicts, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+class _ConnectedMcpTool(McpTool):
+    """An ``McpTool`` that waits for its connection before each call.
+
+    A tool called while the connection is still opening would otherwise
+    open a second session in the caller's task, which cannot close it.
+    """
+
+    def __init__(self, connection: "McpConnection", **kwargs):
+        super().__init__(**kwargs)
+        self._connection = connection
+
+    async def run_async(self, *, args, tool_context):
+        await self._connection.ensure_connected()
+        return await super().run_async(args=args, tool_context=tool_context)
+
+
+class McpConnection(McpToolset):
+    """An MCP toolset that stays connected and caches its tools.
+
+    Args:
+        connection_params: StreamableHTTP, SSE or stdio connection params, as
+            for ``McpToolset``.
+        cache_path (str | Path): JSON file for the discovered tools. None
+            keeps them in memory only.
+        refresh_interval (float): Age in seconds after which the tools are
+            listed again in the background.
+        health_interval (float): Seconds between background pings. 0 turns
+            the background check off.
+        max_attempts (int): Connection attempts before giving up.
+        **toolset_kwargs: Other ``McpToolset`` arguments, e.g. ``tool_filter``.
+    """
+
+    def __init__(
+        self,
+        connection_params,
+        cache_path=None,
+        refresh_interval: float = REFRESH_INTERVAL,
+        health_interval: float = HEALTH_INTERVAL,
+        max_attempts: int = MAX_ATTEMPTS,
+        **toolset_kwargs,
+    ):
+        super().__init__(connection_params=connection_params, **toolset_kwargs)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.refresh_interval = refresh_interval
+        self.health_interval = health_interval
+        self.max_attempts = max_attempts
+        self.connects = 0
+        self.reconnects = 0
+        self.failed_pings = 0
+        self.refreshes = 0
+        self.tool_changes = 0
+        self.etag = None
+        self._fetched_at = 0.0  # time.time() of the last listing
+        self._refreshing = None
+        self._supervisor = None
+        self._ready = None  # set while connected, or when connecting failed
+        self._wake = None  # asks the supervisor to retry a failed connect
+        self._error = None
+        self._tools = self._load_cache()
+
+    # --- Tool cache ---
+    def _server(self) -> str:
+        """Identifies the server in the cache file, so a changed URL is not served stale tools."""
+        params = self._connection_params
+        return getattr(params, "url", None) or repr(getattr(params, "server_params", params))
+
+    def _wrap(self, tool: types.Tool) -> McpTool:
+        return _ConnectedMcpTool(
+            self,
+            mcp_tool=tool,
+            mcp_session_manager=self._mcp_session_manager,
+            auth_scheme=self._auth_scheme,
+            auth_credential=self._auth_credential,
+            require_confirmation=self._require_confirmation,
+            header_provider=self._header_provider,
+        )
+
+    def _load_cache(self) -> Optional[list]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return None
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            if data.get("version") != CACHE_VERSION or data.get("server") != self._server():
+                return None
+            tools = [self._wrap(types.Tool.model_validate(tool)) for tool in data["tools"]]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring MCP tool cache %s: %s", self.cache_path, e)
+            return None
+        self.etag = data.get("etag")
+        self._fetched_at = data.get("fetched_at", 0.0)
+        return tools
+
+    def _save_cache(self, tool_dicts: list[dict]) -> None:
+        data = {
+            "version": CACHE_VERSION,
+            "server": self._server(),
+            "etag": self.etag,
+            "fetched_at": self._fetched_at,
+            "tools": tool_dicts,
+        }
+        # Write then rename, so a crash or another process never reads half a file
+        tmp = self.cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        tmp.replace(self.cache_path)
+
+    async def refresh(self) -> bool:
+        """List the server's tools now and update the cache.
+
+        Returns:
+            bool: Whether the tools differ from the ones held before.
+        """
+        await self.ensure_connected()
+        session = await self._session()
+        timeout = getattr(self._connection_params, "timeout", None)
+        result = await asyncio.wait_for(session.list_tools(), timeout=timeout)
+        tool_dicts = [tool.model_dump(mode="json", exclude_none=True) for tool in result.tools]
+        etag = _etag(tool_dicts)
+        changed = etag != self.etag
+        self.refreshes += 1
+        self._fetched_at = time.time()
+        if changed:
+            if self._tools is not None:
+                self.tool_changes += 1
+                logger.info("MCP tools changed: %s", [tool.name for tool in result.tools])
+            self._tools = [self._wrap(tool) for tool in result.tools]
+            self.etag = etag
+        if self.cache_path is not None:
+            self._save_cache(tool_dicts)
+        return changed
+
+    def _refresh_soon(self) -> None:
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            # Keep serving the tools we have
+            logger.warning("MCP tool refresh failed: %s", e)
+
+    async def get_tools(self, readonly_context: Optional[ReadonlyContext] = None) -> list:
+        """The server's tools, from memory or the cache file when there are
+        any; otherwise listed now, which only the first call pays for."""
+        if self._tools is None:
+            await self.refresh()
+        else:
+            # Connect in the background, so the first tool call finds a session
+            self._start()
+            if time.time() - self._fetched_at > self.refresh_interval:
+                self._refresh_soon()
+        return [tool for tool in self._tools if self._is_tool_selected(tool, readonly_context)]
+
+    # --- Connection ---
+    async def _session(self):
+        # ADK's session manager reuses its open session and replaces one
+        # whose streams have closed
+        return await self._mcp_session_manager.create_session()
+
+    def _watch_tool_changes(self, session) -> None:
+        # ADK opens the ClientSession without a message handler; wrap the
+        # default one to hear about tool list changes
+        forward = session._message_handler
+
+        async def handler(message):
+            if isinstance(message, types.ServerNotification) and isinstance(
+                message.root, types.ToolListChangedNotification
+            ):
+                self._refresh_soon()
+            await forward(message)
+
+        session._message_handler = handler
+
+    async def _ping(self) -> bool:
+        try:
+            session = await self._session()
+            await asyncio.wait_for(session.send_ping(), timeout=PING_TIMEOUT)
+        except Exception as e:
+            self.failed_pings += 1
+            logger.warning("MCP ping failed: %s", e)
+            return False
+        return True
+
+    async def _own_session(self) -> None:
+        """Open one session and keep it until a health check fails.
+
+        Runs as its own task: the MCP transports are anyio task groups that
+        must be closed by the task that opened them, and a transport that
+        fails (including while connecting) cancels that task for good.
+        """
+        try:
+            self._watch_tool_changes(await self._session())
+            self.connects += 1
+            self._ready.set()
+            if self.connects > 1:
+                # The tools may have changed while we were away
+                self._refresh_soon()
+            while await self._healthy_after_wait():
+                pass
+        finally:
+            self._ready.clear()
+            await McpToolset.close(self)
+
+    async def _healthy_after_wait(self) -> bool:
+        if not self.health_interval:
+            await asyncio.Event().wait()  # no background checks; wait for close()
+        await asyncio.sleep(self.health_interval)
+        return await self._ping()
+
+    async def _supervise(self) -> None:
+        """Keep a session open: reconnect at once when one is lost, and back
+        off exponentially between failed connects."""
+        failures = 0
+        while True:
+            connects = self.connects
+            owner = asyncio.create_task(self._own_session())
+            try:
+                await asyncio.wait([owner])
+            except asyncio.CancelledError:  # close()
+                owner.cancel()
+                await asyncio.wait([owner])
+                raise
+            if self.connects > connects:
+                # Was connected, then lost the server
+                failures = 0
+                self.reconnects += 1
+                continue
+
+            failures += 1
+            error = "the transport closed while connecting" if owner.cancelled() else owner.exception()
+            if failures < self.max_attempts:
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (failures - 1)) * random.uniform(0.5, 1.0)
+                logger.warning("MCP connect failed (%s); retrying in %.1f s", error, delay)
+                await asyncio.sleep(delay)
+                continue
+
+            # Report the failure, then wait until someone needs the server again
+            self._error = ConnectionError(
+                f"Could not connect to the MCP server after {self.max_attempts} attempts: {error}"
+            )
+            self._ready.set()
+            await self._wake.wait()
+            self._wake.clear()
+            self._error = None
+            failures = 0
+
+    def _start(self) -> None:
+        if self._supervisor is None:
+            self._ready = asyncio.Event()
+            self._wake = asyncio.Event()
+            self._supervisor = asyncio.create_task(self._supervise())
+
+    async def ensure_connected(self) -> None:
+        """Connect on first use; wait out a reconnect in progress.
+
+        Raises:
+            ConnectionError: The server could not be reached after
+                ``max_attempts`` tries. The next call tries again.
+        """
+        if self._supervisor is None:
+            self._start()
+        elif self._error is not None:
+            self._ready.clear()
+            self._wake.set()
+        await self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    async def close(self) -> None:
+        """Stop refreshes and health checks, and close the connection."""
+        for task in (self._refreshing, self._supervisor):
+            if task is not None:
+                task.cancel()
+                await asyncio.wait([task])
+        self._refreshing = None
+        self._supervisor = None
+        self._error = None
+
+    def stats(self) -> dict:
+        return {
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "failed_pings": self.failed_pings,
+            "refreshes": self.refreshes,
+            "tool_changes": self.tool_changes,
+            "tools": len(self._tools) if self._tools is not None else None,
+            "etag": self.etag,
+        }
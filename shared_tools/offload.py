@@ -0,0 +1,58 @@
+"""Run blocking tools off the event loop.
+
+ADK calls synchronous tool functions directly inside ``Runner.run_async``,
+so a tool waiting on the network or disk stalls every other session on that
+event loop. ``run_in_thread`` turns such a tool into a coroutine function
+that runs it on a bounded worker pool instead.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Blocking tool calls allowed to run at once across all sessions
+TOOL_THREADS = int(os.getenv("TOOL_THREADS", "16"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the process-wide pool that blocking tools run on.
+
+    It is separate from the event loop's default executor, which asyncio
+    itself uses for DNS lookups.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=TOOL_THREADS, thread_name_prefix="tool"
+                )
+    return _executor
+
+
+def run_in_thread(func):
+    """Wrap a blocking tool so it is awaited on the tool thread pool.
+
+    The wrapper keeps ``func``'s name, docstring and signature, so ADK builds
+    the same function declaration for it. Context variables are copied into
+    the worker thread.
+
+    Args:
+        func: Synchronous tool function.
+
+    Returns:
+        A coroutine function with the same interface as ``func``.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        return await loop.run_in_executor(get_executor(), call)
+
+    return wrapper
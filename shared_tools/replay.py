@@ -0,0 +1,277 @@
+"""Record and replay model responses and tool results for offline runs.
+
+A run in ``record`` mode talks to the real model and tools and writes every
+model response and tool result to a JSONL cassette. A run in ``replay`` mode
+serves them back from the cassette, so the same conversation goes through
+``Runner.run_async`` with no API keys or network. This is meant for load
+tests and benchmarks.
+
+Model calls are intercepted by swapping each LlmAgent's model for a
+CassetteLlm, so the agents' own callbacks (guardrails etc.) still run. Tool
+calls are intercepted by a Runner plugin. Both are looked up by a
+fingerprint of their input (conversation contents or tool arguments) rather
+than by call order, so concurrent sessions replay deterministically.
+
+Usage::
+
+    cassette = Cassette(Path("session.jsonl"), mode="replay")
+    plugin = install(root_agent, cassette)
+    runner = Runner(agent=root_agent, app_name=..., session_service=...,
+                    plugins=[plugin])
+
+or from the repo root::
+
+    python -m shared_tools.replay record agent_session session.jsonl "Weather in Paris?"
+    python -m shared_tools.replay replay agent_session session.jsonl "Weather in Paris?"
+"""
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools.agent_tool import AgentTool
+
+from .agents import iter_agents
+
+# Tools that act on the session (transfers, loop exits) always run for real
+PASSTHROUGH_TOOLS = frozenset({"transfer_to_agent", "exit_loop"})
+
+
+def intercepts_tool(tool) -> bool:
+    """Whether calls to ``tool`` are recorded and replayed rather than run."""
+    return tool.name not in PASSTHROUGH_TOOLS and not isinstance(tool, AgentTool)
+
+
+class ReplayMiss(KeyError):
+    """The cassette has no recording for a model call or tool call."""
+
+
+def _fingerprint(value) -> str:
+    data = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:24]
+
+
+def request_fingerprint(llm_request: LlmRequest) -> str:
+    """Fingerprint the conversation a model call sees.
+
+    Function call ids are random per run, so only names, arguments,
+    responses and text are included.
+    """
+    contents = []
+    for content in llm_request.contents:
+        parts = []
+        for part in content.parts or []:
+            if part.text is not None:
+                parts.append({"text": part.text})
+            elif part.function_call is not None:
+                parts.append({"call": part.function_call.name, "args": part.function_call.args})
+            elif part.function_response is not None:
+                parts.append({
+                    "response": part.function_response.name,
+                    "value": part.function_response.response,
+                })
+        contents.append({"role": content.role, "parts": parts})
+    return _fingerprint(contents)
+
+
+class Cassette:
+    """A JSONL file of recorded model responses and tool results.
+
+    Args:
+        path (Path): The cassette file.
+        mode (str): "record" starts a fresh file and appends to it as calls
+            happen; "replay" loads it and serves lookups.
+    """
+
+    def __init__(self, path: Path, mode: str = "replay"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode '{mode}'. Use 'record' or 'replay'.")
+        self.path = Path(path)
+        self.mode = mode
+        self._records = {}  # (type, agent, name, fingerprint) -> record
+        self._lock = threading.Lock()
+        if mode == "record":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text("", encoding="utf-8")
+        else:
+            with self.path.open(encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        # The first recording of a call wins
+                        self._records.setdefault(self._key(record), record)
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @staticmethod
+    def _key(record: dict) -> tuple:
+        return record["type"], record["agent"], record.get("tool", ""), record["key"]
+
+    def _append(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock, self.path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def _lookup(self, record: dict) -> dict:
+        found = self._records.get(self._key(record))
+        if found is None:
+            call = f"tool call {record['tool']}" if "tool" in record else "model call"
+            raise ReplayMiss(
+                f"No recording in {self.path} for the {call} by agent "
+                f"'{record['agent']}' (key {record['key']}). Re-record the cassette."
+            )
+        return found
+
+    def record_model(self, agent: str, key: str, responses: list[LlmResponse]) -> None:
+        self._append({
+            "type": "model",
+            "agent": agent,
+            "key": key,
+            "responses": [r.model_dump(mode="json", exclude_none=True) for r in responses],
+        })
+
+    def replay_model(self, agent: str, key: str) -> list[LlmResponse]:
+        record = self._lookup({"type": "model", "agent": agent, "key": key})
+        return [LlmResponse.model_validate(r) for r in record["responses"]]
+
+    def record_tool(self, agent: str, tool: str, args: dict, result) -> None:
+        self._append({
+            "type": "tool",
+            "agent": agent,
+            "tool": tool,
+            "key": _fingerprint(args),
+            "args": args,
+            "result": result,
+        })
+
+    def replay_tool(self, agent: str, tool: str, args: dict):
+        return self._lookup({"type": "tool", "agent": agent, "tool": tool, "key": _fingerprint(args)})["result"]
+
+
+class CassetteLlm(BaseLlm):
+    """Model that records ``inner``'s responses, or replays them.
+
+    ``model`` keeps the real model name, so tools that check it (e.g.
+    google_search) behave the same while replaying.
+    """
+
+    cassette: Cassette
+    agent_name: str
+    inner: Optional[BaseLlm] = None
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        key = request_fingerprint(llm_request)
+        if not self.cassette.recording:
+            for response in self.cassette.replay_model(self.agent_name, key):
+                yield response
+            return
+
+        responses = []
+        async for response in self.inner.generate_content_async(llm_request, stream=stream):
+            responses.append(response)
+            yield response
+        self.cassette.record_model(self.agent_name, key, responses)
+
+
+class CassettePlugin(BasePlugin):
+    """Runner plugin that records tool results, or replays them without running the tool."""
+
+    def __init__(self, cassette: Cassette):
+        super().__init__(name="cassette")
+        self.cassette = cassette
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context) -> Optional[dict]:
+        if self.cassette.recording or not intercepts_tool(tool):
+            return None
+        return self.cassette.replay_tool(tool_context.agent_name, tool.name, tool_args)
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result) -> Optional[dict]:
+        if self.cassette.recording and intercepts_tool(tool):
+            self.cassette.record_tool(tool_context.agent_name, tool.name, tool_args, result)
+        return None
+
+
+def install(root_agent, cassette: Cassette) -> CassettePlugin:
+    """Route every model call in ``root_agent``'s tree through ``cassette``.
+
+    Agents are modified in place. Pass the returned plugin to the Runner so
+    tool calls go through the cassette too.
+
+    Args:
+        root_agent: The agent to record or replay.
+        cassette (Cassette): Where calls are recorded to or replayed from.
+
+    Returns:
+        CassettePlugin: Plugin for ``Runner(plugins=[...])``.
+    """
+    llm_agents = [agent for agent in iter_agents(root_agent) if isinstance(agent, LlmAgent)]
+    # Resolve every model (including inherited ones) before replacing any
+    models = [agent.canonical_model for agent in llm_agents]
+    for agent, model in zip(llm_agents, models):
+        # Installing again (e.g. record, then replay) swaps the cassette only
+        inner = model.inner if isinstance(model, CassetteLlm) else model
+        agent.model = CassetteLlm(
+            model=model.model,
+            cassette=cassette,
+            agent_name=agent.name,
+            inner=inner if cassette.recording else None,
+        )
+    return CassettePlugin(cassette)
+
+
+async def run_conversation(root_agent, messages: list[str], plugins=None) -> list[str]:
+    """Send ``messages`` to ``root_agent`` in one new session.
+
+    Returns:
+        list[str]: The final response text for each message.
+    """
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+
+    runner = InMemoryRunner(agent=root_agent, app_name="replay", plugins=plugins)
+    session = await runner.session_service.create_session(app_name="replay", user_id="replay")
+    replies = []
+    for message in messages:
+        reply = ""
+        content = types.Content(role="user", parts=[types.Part(text=message)])
+        async for event in runner.run_async(
+            user_id="replay", session_id=session.id, new_message=content
+        ):
+            if event.is_final_response() and event.content and event.content.parts:
+                reply = "".join(part.text or "" for part in event.content.parts)
+        replies.append(reply)
+    await runner.close()
+    return replies
+
+
+def main(argv=None) -> None:
+    import argparse
+    import asyncio
+    import importlib
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("agent", help="Agent package, e.g. agent_session")
+    parser.add_argument("cassette", type=Path)
+    parser.add_argument("messages", nargs="+", help="User messages, sent in order")
+    args = parser.parse_args(argv)
+
+    root_agent = importlib.import_module(f"{args.agent}.agent").root_agent
+    plugin = install(root_agent, Cassette(args.cassette, mode=args.mode))
+    replies = asyncio.run(run_conversation(root_agent, args.messages, plugins=[plugin]))
+    for message, reply in zip(args.messages, replies):
+        print(f"User: {message}\nAgent: {reply}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Tavily web search tool shared by the tool-using agents.
+
+One TavilyClient (and so one keep-alive connection pool) is reused for the
+whole process. Raw results are cached per (query, depth), and the report
+handed back to the model is trimmed to a token budget.
+"""
+import os
+import threading
+
+from tavily import TavilyClient
+
+from .cache import TTLCache
+
+SEARCH_DEPTH = "basic"
+MAX_RESULTS = 5
+
+# Approximate prompt tokens the report may use (~4 characters per token)
+SEARCH_TOKEN_BUDGET = int(os.getenv("TAVILY_TOKEN_BUDGET", "1500"))
+CHARS_PER_TOKEN = 4
+
+# Web results go stale more slowly than weather
+SEARCH_CACHE_TTL = 900
+SEARCH_CACHE_SIZE = 512
+
+search_cache = TTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+
+_clients = {}  # api key -> TavilyClient
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key: str) -> TavilyClient:
+    """Return the process-wide TavilyClient for ``api_key``."""
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = _clients[api_key] = TavilyClient(api_key=api_key)
+        return client
+
+
+def _cache_key(query: str, search_depth: str) -> tuple:
+    return " ".join(query.split()).casefold(), search_depth
+
+
+def _format_results(results: list[dict], token_budget: int) -> str:
+    """Join results best-first until ``token_budget`` is spent.
+
+    The result that crosses the budget is cut at a word boundary; anything
+    after it is dropped.
+    """
+    remaining = token_budget * CHARS_PER_TOKEN
+    sections = []
+    for res in results:
+        header = f"Source: {res['url']}\nContent: "
+        content = res["content"]
+        if len(header) + len(content) > remaining:
+            room = remaining - len(header)
+            if room < 20 * CHARS_PER_TOKEN:
+                break
+            content = content[:room].rsplit(" ", 1)[0] + " ..."
+        sections.append(header + content)
+        remaining -= len(header) + len(content) + 1
+        if remaining <= 0:
+            break
+    return "\n".join(sections)
+
+
+def tavily_search(query: str) -> dict:
+    """Searches the web for information using Tavily.
+
+    Args:
+        query (str): The search query.
+
+    Returns:
+        dict: status and search results or error msg.
+    """
+    api_key = os.getenv("TAVILY_API_KEY")
+    if not api_key:
+        return {"status": "error", "error_message": "Tavily API key not configured."}
+
+    def fetch():
+        response = get_client(api_key).search(
+            query=query, search_depth=SEARCH_DEPTH, max_results=MAX_RESULTS
+        )
+        # Keep only what the report uses
+        return [
+            {"url": res["url"], "content": res["content"]}
+            for res in response.get("results", [])
+        ]
+
+    try:
+        results = search_cache.get_or_load(_cache_key(query, SEARCH_DEPTH), fetch)
+        return {"status": "success", "report": _format_results(results, SEARCH_TOKEN_BUDGET)}
+    except Exception as e:
+        return {"status": "error", "error_message": str(e)}
+
+
+def search_cache_stats() -> dict:
+    """Hit-rate metrics for the search cache."""
+    return search_cache.stats()
@@ -0,0 +1,553 @@
+"""ADK session services for long-running and multi-worker deployments.
+
+``BatchedSqliteSessionService`` is a drop-in replacement for
+``InMemorySessionService`` whose sessions survive restarts and can be shared
+by several ``adk web`` workers on one host. Compared with ADK's own
+``SqliteSessionService`` (same tables, so databases are interchangeable):
+
+- one long-lived connection in WAL mode with ``synchronous=NORMAL``, owned
+  by a dedicated thread, instead of a new connection (and schema script)
+  per call;
+- event writes are append-only inserts, committed in batches: a commit
+  happens at the end of each turn (the final response), after
+  ``max_batch`` events, or ``commit_interval`` seconds after the first
+  uncommitted write, whichever comes first;
+- an index on (app, user, session, timestamp) for event lookups;
+- events are parsed from JSON once per process: ``get_session`` reads only
+  rows newer than the ones already cached for that session, and
+  ``list_sessions`` never loads events.
+
+Other workers see a turn's events once it is committed, i.e. by the time
+its final response is delivered.
+
+``BoundedInMemorySessionService`` keeps sessions in memory like ADK's
+default, but drops idle sessions and caps total size, for a single process
+serving many short-lived visitors.
+"""
+import asyncio
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session, State
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+# Same tables as google.adk.sessions.SqliteSessionService, plus an index
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    update_time REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT NOT NULL,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    invocation_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    event_data TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, id),
+    FOREIGN KEY (app_name, user_id, session_id) REFERENCES sessions(app_name, user_id, id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS events_by_session_time
+    ON events (app_name, user_id, session_id, timestamp);
+"""
+
+# How long a write waits for another worker's transaction before failing
+BUSY_TIMEOUT_MS = 5000
+
+
+def _split_state(state: Optional[dict]) -> tuple[dict, dict, dict]:
+    """Split a state dict into app, user and session parts; temp keys are dropped."""
+    app, user, session = {}, {}, {}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            app[key.removeprefix(State.APP_PREFIX)] = value
+        elif key.startswith(State.USER_PREFIX):
+            user[key.removeprefix(State.USER_PREFIX)] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session[key] = value
+    return app, user, session
+
+
+def _merge_state(app_state: dict, user_state: dict, session_state: dict) -> dict:
+    merged = dict(session_state)
+    merged.update({State.APP_PREFIX + key: value for key, value in app_state.items()})
+    merged.update({State.USER_PREFIX + key: value for key, value in user_state.items()})
+    return merged
+
+
+class BatchedSqliteSessionService(BaseSessionService):
+    """ADK session service on a WAL-mode SQLite file with batched commits.
+
+    Args:
+        db_path (str | Path): The database file; created if missing.
+        commit_interval (float): Longest time in seconds an event may stay
+            uncommitted. 0 commits every event.
+        max_batch (int): Uncommitted events that force a commit.
+        cached_sessions (int): Sessions whose parsed events are kept in memory.
+    """
+
+    def __init__(
+        self,
+        db_path,
+        commit_interval: float = 0.05,
+        max_batch: int = 64,
+        cached_sessions: int = 256,
+    ):
+        self.db_path = Path(db_path)
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+        self.cached_sessions = cached_sessions
+        self.commits = 0
+        self.events_written = 0
+        self.events_parsed = 0
+        self._pending = 0
+        self._timer = None
+        # (app, user, session) -> (create_time, events, event ids); DB thread only
+        self._events = OrderedDict()
+        # Every query runs on this one thread, so the connection needs no lock
+        # and the service works from any event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-db")
+        self._conn = self._executor.submit(self._connect).result()
+        atexit.register(self._commit_at_exit)
+
+    # --- Connection and commits (DB thread) ---
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode NORMAL only syncs at checkpoints; commits stay durable
+        # across application crashes, not power loss
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _begin(self) -> None:
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN IMMEDIATE")
+
+    def _commit(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._conn.in_transaction:
+            self._conn.execute("COMMIT")
+            self.commits += 1
+        self._pending = 0
+
+    def _written(self, commit_now: bool) -> None:
+        self._pending += 1
+        if commit_now or self._pending >= self.max_batch or self.commit_interval <= 0:
+            self._commit()
+        elif self._timer is None:
+            self._timer = threading.Timer(
+                self.commit_interval, self._executor.submit, args=(self._commit,)
+            )
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _commit_at_exit(self) -> None:
+        # The executor is already shut down at exit; the DB thread is idle
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._conn is not None and self._conn.in_transaction:
+            self._conn.execute("COMMIT")
+
+    async def _run(self, fn, *args):
+        return await asyncio.wrap_future(self._executor.submit(fn, *args))
+
+    # --- State helpers (DB thread) ---
+    def _state(self, query: str, params: tuple) -> dict:
+        row = self._conn.execute(query, params).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def _app_state(self, app_name: str) -> dict:
+        return self._state("SELECT state FROM app_states WHERE app_name=?", (app_name,))
+
+    def _user_state(self, app_name: str, user_id: str) -> dict:
+        return self._state(
+            "SELECT state FROM user_states WHERE app_name=? AND user_id=?", (app_name, user_id)
+        )
+
+    def _apply_deltas(self, app_name: str, user_id: str, app_delta: dict, user_delta: dict, now: float) -> None:
+        if app_delta:
+            self._conn.execute(
+                "INSERT INTO app_states (app_name, state, update_time) VALUES (?, ?, ?)"
+                " ON CONFLICT(app_name) DO UPDATE SET state=json_patch(state, excluded.state),"
+                " update_time=excluded.update_time",
+                (app_name, json.dumps(app_delta), now),
+            )
+        if user_delta:
+            self._conn.execute(
+                "INSERT INTO user_states (app_name, user_id, state, update_time) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(app_name, user_id) DO UPDATE SET state=json_patch(state, excluded.state),"
+                " update_time=excluded.update_time",
+                (app_name, user_id, json.dumps(user_delta), now),
+            )
+
+    # --- Operations (DB thread) ---
+    def _create_session(self, app_name, user_id, state, session_id, now) -> dict:
+        self._begin()
+        exists = self._conn.execute(
+            "SELECT 1 FROM sessions WHERE app_name=? AND user_id=? AND id=?",
+            (app_name, user_id, session_id),
+        ).fetchone()
+        if exists:
+            self._commit()
+            raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+        app_delta, user_delta, session_state = _split_state(state)
+        self._apply_deltas(app_name, user_id, app_delta, user_delta, now)
+        self._conn.execute(
+            "INSERT INTO sessions (app_name, user_id, id, state, create_time, update_time)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (app_name, user_id, session_id, json.dumps(session_state), now, now),
+        )
+        merged = _merge_state(self._app_state(app_name), self._user_state(app_name, user_id), session_state)
+        self._written(commit_now=True)
+        return merged
+
+    def _load_events(self, key: tuple, create_time: float) -> list[Event]:
+        cached = self._events.get(key)
+        if cached is None or cached[0] != create_time:
+            # New to this process, or deleted and recreated elsewhere
+            cached = (create_time, [], set())
+        _, events, ids = cached
+        query = "SELECT id, event_data FROM events WHERE app_name=? AND user_id=? AND session_id=?"
+        params = list(key)
+        if events:
+            query += " AND timestamp >= ?"
+            params.append(events[-1].timestamp)
+        for event_id, data in self._conn.execute(query + " ORDER BY timestamp, rowid", params):
+            if event_id not in ids:
+                events.append(Event.model_validate_json(data))
+                ids.add(event_id)
+                self.events_parsed += 1
+        self._events[key] = cached
+        self._events.move_to_end(key)
+        while len(self._events) > self.cached_sessions:
+            self._events.popitem(last=False)
+        return list(events)
+
+    def _get_session(self, app_name, user_id, session_id):
+        key = (app_name, user_id, session_id)
+        row = self._conn.execute(
+            "SELECT state, create_time, update_time FROM sessions WHERE app_name=? AND user_id=? AND id=?",
+            key,
+        ).fetchone()
+        if row is None:
+            self._events.pop(key, None)
+            return None
+        state, create_time, update_time = row
+        events = self._load_events(key, create_time)
+        merged = _merge_state(self._app_state(app_name), self._user_state(app_name, user_id), json.loads(state))
+        return merged, events, update_time
+
+    def _list_sessions(self, app_name, user_id):
+        query = "SELECT id, user_id, state, update_time FROM sessions WHERE app_name=?"
+        params = [app_name]
+        if user_id is not None:
+            query += " AND user_id=?"
+            params.append(user_id)
+        rows = self._conn.execute(query, params).fetchall()
+        app_state = self._app_state(app_name)
+        user_states = {
+            uid: json.loads(state)
+            for uid, state in self._conn.execute(
+                "SELECT user_id, state FROM user_states WHERE app_name=?", (app_name,)
+            )
+        }
+        return [
+            (sid, uid, _merge_state(app_state, user_states.get(uid, {}), json.loads(state)), update_time)
+            for sid, uid, state, update_time in rows
+        ]
+
+    def _delete_session(self, app_name, user_id, session_id) -> None:
+        self._begin()
+        self._conn.execute(
+            "DELETE FROM sessions WHERE app_name=? AND user_id=? AND id=?",
+            (app_name, user_id, session_id),
+        )
+        self._events.pop((app_name, user_id, session_id), None)
+        self._written(commit_now=True)
+
+    def _append_event(self, app_name, user_id, session_id, last_update_time, event: Event) -> None:
+        self._begin()
+        row = self._conn.execute(
+            "SELECT update_time FROM sessions WHERE app_name=? AND user_id=? AND id=?",
+            (app_name, user_id, session_id),
+        ).fetchone()
+        if row is None or row[0] > last_update_time:
+            # Release the write lock (keeping any batched events) before failing
+            self._commit()
+        if row is None:
+            raise ValueError(f"Session {session_id} not found.")
+        if row[0] > last_update_time:
+            raise ValueError(
+                "The last_update_time provided in the session object is earlier than the"
+                " update_time in storage. Please check if it is a stale session."
+            )
+
+        now = event.timestamp
+        session_delta = {}
+        if event.actions and event.actions.state_delta:
+            app_delta, user_delta, session_delta = _split_state(event.actions.state_delta)
+            self._apply_deltas(app_name, user_id, app_delta, user_delta, now)
+        self._conn.execute(
+            "UPDATE sessions SET state=json_patch(state, ?), update_time=?"
+            " WHERE app_name=? AND user_id=? AND id=?",
+            (json.dumps(session_delta), now, app_name, user_id, session_id),
+        )
+        self._conn.execute(
+            "INSERT INTO events (id, app_name, user_id, session_id, invocation_id, timestamp, event_data)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                event.id, app_name, user_id, session_id, event.invocation_id,
+                event.timestamp, event.model_dump_json(exclude_none=True),
+            ),
+        )
+        self.events_written += 1
+        # Commit at the end of each turn so other workers see complete turns
+        self._written(commit_now=event.is_final_response())
+
+    # --- BaseSessionService ---
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        now = time.time()
+        merged = await self._run(self._create_session, app_name, user_id, state, session_id, now)
+        return Session(
+            app_name=app_name, user_id=user_id, id=session_id,
+            state=merged, events=[], last_update_time=now,
+        )
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        found = await self._run(self._get_session, app_name, user_id, session_id)
+        if found is None:
+            return None
+        state, events, update_time = found
+        if config and config.after_timestamp:
+            events = [event for event in events if event.timestamp >= config.after_timestamp]
+        if config and config.num_recent_events:
+            events = events[-config.num_recent_events:]
+        return Session(
+            app_name=app_name, user_id=user_id, id=session_id,
+            state=state, events=events, last_update_time=update_time,
+        )
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        rows = await self._run(self._list_sessions, app_name, user_id)
+        return ListSessionsResponse(sessions=[
+            Session(
+                app_name=app_name, user_id=uid, id=sid,
+                state=state, events=[], last_update_time=update_time,
+            )
+            for sid, uid, state, update_time in rows
+        ])
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self._run(self._delete_session, app_name, user_id, session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        event = self._trim_temp_delta_state(event)
+        await self._run(
+            self._append_event, session.app_name, session.user_id, session.id,
+            session.last_update_time, event,
+        )
+        session.last_update_time = event.timestamp
+        await super().append_event(session=session, event=event)
+        return event
+
+    async def flush(self) -> None:
+        """Commit any batched events now."""
+        await self._run(self._commit)
+
+    def close(self) -> None:
+        """Commit pending events and close the database."""
+        self._executor.submit(self._commit).result()
+        self._executor.submit(self._conn.close).result()
+        self._executor.shutdown()
+        self._conn = None
+        atexit.unregister(self._commit_at_exit)
+
+    def stats(self) -> dict:
+        """Write, commit and parse counters."""
+        return {
+            "events_written": self.events_written,
+            "commits": self.commits,
+            "events_per_commit": round(self.events_written / self.commits, 2) if self.commits else 0.0,
+            "events_parsed": self.events_parsed,
+        }
+
+
+class BoundedInMemorySessionService(InMemorySessionService):
+    """InMemorySessionService that forgets idle sessions and caps its memory.
+
+    A process serving many visitors otherwise keeps every session it ever
+    created. Sessions are dropped, least recently used first, once idle for
+    ``idle_timeout`` seconds or while their events take more than
+    ``max_bytes``; a visitor returning to a dropped session starts afresh.
+
+    Args:
+        idle_timeout (float): Seconds without a read or write after which a
+            session is dropped. None keeps sessions until memory runs short.
+        max_bytes (int): Approximate ceiling on the size of all stored
+            events (measured as their JSON). None means no ceiling.
+    """
+
+    def __init__(self, idle_timeout: Optional[float] = None, max_bytes: Optional[int] = None):
+        super().__init__()
+        self.idle_timeout = idle_timeout
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.evicted = 0
+        # (app, user, session) -> [last used, event bytes]; least recently used first
+        self._usage = OrderedDict()
+
+    def _touch(self, key: tuple, added_bytes: int = 0) -> None:
+        usage = self._usage.setdefault(key, [0.0, 0])
+        usage[0] = time.monotonic()
+        usage[1] += added_bytes
+        self.total_bytes += added_bytes
+        self._usage.move_to_end(key)
+        self._evict(keep=key)
+
+    def _expired(self, key: tuple) -> bool:
+        last_used = self._usage[key][0]
+        return self.idle_timeout is not None and time.monotonic() - last_used > self.idle_timeout
+
+    def _evict(self, keep: Optional[tuple] = None) -> None:
+        while self._usage:
+            key = next(iter(self._usage))
+            full = self.max_bytes is not None and self.total_bytes > self.max_bytes
+            if key == keep or not (self._expired(key) or full):
+                break
+            self._drop(key)
+
+    def _drop(self, key: tuple) -> None:
+        app_name, user_id, session_id = key
+        _, size = self._usage.pop(key)
+        self.total_bytes -= size
+        self.evicted += 1
+        user_sessions = self.sessions.get(app_name, {}).get(user_id, {})
+        user_sessions.pop(session_id, None)
+        if not user_sessions:
+            # Last session of this visitor: their user: state goes too
+            self.sessions.get(app_name, {}).pop(user_id, None)
+            self.user_state.get(app_name, {}).pop(user_id, None)
+
+    async def create_session(self, *, app_name: str, user_id: str, **kwargs) -> Session:
+        session = await super().create_session(app_name=app_name, user_id=user_id, **kwargs)
+        self._touch((app_name, user_id, session.id))
+        return session
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str, **kwargs) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        if key in self._usage and self._expired(key):
+            # Idle too long: reading it must not bring it back
+            self._drop(key)
+        if key in self._usage:
+            self._touch(key)
+        else:
+            self._evict()
+        return await super().get_session(app_name=app_name, user_id=user_id, session_id=session_id, **kwargs)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        if key in self._usage:
+            self._drop(key)
+            self.evicted -= 1  # deleted, not evicted
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await super().append_event(session=session, event=event)
+        key = (session.app_name, session.user_id, session.id)
+        if not event.partial and key in self._usage:
+            self._touch(key, len(event.model_dump_json(exclude_none=True)))
+        return event
+
+    def stats(self) -> dict:
+        """Stored sessions, their approximate size and how many were evicted."""
+        return {
+            "sessions": len(self._usage),
+            "event_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "evicted": self.evicted,
+        }
+
+
+def make_session_service(
+    idle_timeout: Optional[float] = None, max_bytes: Optional[int] = None
+) -> BaseSessionService:
+    """Session service for the example scripts.
+
+    Returns a BatchedSqliteSessionService on the file named by the
+    SESSION_DB environment variable. Otherwise sessions live in memory:
+    in a BoundedInMemorySessionService if a limit is given, else an
+    InMemorySessionService.
+
+    Args:
+        idle_timeout (float): Seconds after which idle in-memory sessions are dropped.
+        max_bytes (int): Approximate ceiling on in-memory event storage.
+    """
+    db_path = os.getenv("SESSION_DB")
+    if db_path:
+        return BatchedSqliteSessionService(db_path)
+    if idle_timeout is not None or max_bytes is not None:
+        return BoundedInMemorySessionService(idle_timeout=idle_timeout, max_bytes=max_bytes)
+    return InMemorySessionService()
+
+
+async def get_or_create_session(
+    session_service: BaseSessionService, app_name: str, user_id: str, session_id: str
+) -> Session:
+    """Resume ``session_id`` if the service already has it, otherwise create it."""
+    session = await session_service.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    if session is None:
+        session = await session_service.create_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+    return session
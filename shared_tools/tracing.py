@@ -0,0 +1,319 @@
+"""Per-turn spans derived from a Runner's event stream.
+
+``TurnTracer.trace`` wraps ``runner.run_async(...)`` and passes every event
+through unchanged while timing what happens in between:
+
+- one ``turn`` span per call, with one ``agent`` span per agent that spoke
+  (a transfer ends one agent span and starts the next);
+- a ``model`` span for each model response, from the moment the agent was
+  waiting on the model (turn start, last tool result) until the response
+  arrived, with token counts and time to first chunk when streaming;
+- a ``tool`` span per function call. ADK merges the responses of parallel
+  calls into one event, so each tool is timed by ``tracer.plugin`` (pass it
+  to ``Runner(plugins=[...])``) around its own execution; without the
+  plugin a span runs from the call until its response arrives;
+- a zero-length ``transfer`` span for each agent transfer.
+
+Spans can be exported as OTLP/JSON (OpenTelemetry's JSON encoding, loadable
+by collectors and most trace viewers) or as a Chrome trace for
+chrome://tracing and https://ui.perfetto.dev. Timings are measured where the
+events arrive, so each span also includes the small ADK overhead around the
+call it represents. Only the last ``max_turns`` turns are kept.
+"""
+import json
+import secrets
+import time
+from collections import deque
+from pathlib import Path
+from typing import AsyncGenerator, Optional
+
+from google.adk.plugins.base_plugin import BasePlugin
+
+# Turns kept for summaries and export; older ones are dropped
+MAX_TURNS = 100
+
+
+class Span:
+    """One timed operation. Times are ``time.perf_counter_ns()`` values."""
+
+    def __init__(self, kind: str, name: str, start: int, trace_id: str, parent=None, **attributes):
+        self.kind = kind
+        self.name = name
+        self.start = start
+        self.end = None
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = attributes
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or self.start) - self.start) / 1e6
+
+
+class ToolTimingPlugin(BasePlugin):
+    """Runner plugin recording when each tool call starts and ends."""
+
+    def __init__(self):
+        super().__init__(name="tool_timing")
+        # function call id -> [start, end]; taken by TurnTracer.trace
+        self.times = {}
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context) -> Optional[dict]:
+        self.times[tool_context.function_call_id] = [time.perf_counter_ns(), None]
+        return None
+
+    def _ended(self, tool_context) -> None:
+        times = self.times.get(tool_context.function_call_id)
+        if times is not None:
+            times[1] = time.perf_counter_ns()
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result) -> Optional[dict]:
+        self._ended(tool_context)
+        return None
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error) -> Optional[dict]:
+        self._ended(tool_context)
+        return None
+
+
+class TurnTracer:
+    """Collects spans for every turn run through ``trace``.
+
+    Args:
+        service_name (str): Reported as the OTLP ``service.name``.
+        max_turns (int): Most recent turns kept.
+    """
+
+    def __init__(self, service_name: str = "adk-agent", max_turns: int = MAX_TURNS):
+        self.service_name = service_name
+        self.turns = deque(maxlen=max_turns)  # one list of spans per turn, the turn span first
+        self.plugin = ToolTimingPlugin()
+        # Maps perf_counter_ns() onto wall-clock time for export
+        self._epoch_wall_ns = time.time_ns()
+        self._epoch_perf_ns = time.perf_counter_ns()
+
+    async def trace(self, events, **attributes) -> AsyncGenerator:
+        """Yield ``events`` (from ``runner.run_async``) while recording spans.
+
+        Args:
+            events: The async generator returned by ``runner.run_async``.
+            **attributes: Extra attributes for the turn span, e.g. the query.
+        """
+        now = time.perf_counter_ns
+        trace_id = secrets.token_hex(16)
+        turn = Span("turn", "turn", now(), trace_id, **attributes)
+        spans = [turn]
+        self.turns.append(spans)
+
+        agent_span = None
+        ready = turn.start  # when the current agent started waiting on the model
+        first_chunk = None
+        last_event = turn.start
+        open_tools = {}  # function call id -> span
+        try:
+            async for event in events:
+                arrived = now()
+                if event.author != "user" and (agent_span is None or agent_span.name != event.author):
+                    if agent_span is not None:
+                        agent_span.end = last_event
+                    agent_span = Span("agent", event.author, last_event, trace_id, turn)
+                    spans.append(agent_span)
+                    ready = last_event
+
+                responses = event.get_function_responses()
+                if responses:
+                    for response in responses:
+                        span = open_tools.pop(response.id, None)
+                        if span is not None:
+                            start, end = self.plugin.times.pop(response.id, (None, None))
+                            span.start = start or span.start
+                            span.end = end or arrived
+                            result = response.response or {}
+                            span.attributes["status"] = result.get("status", "error" if "error" in result else "ok")
+                    if event.actions and event.actions.transfer_to_agent:
+                        transfer = Span(
+                            "transfer", "transfer", arrived, trace_id, agent_span,
+                            source=event.author, target=event.actions.transfer_to_agent,
+                        )
+                        transfer.end = arrived
+                        spans.append(transfer)
+                    ready = arrived
+                elif event.author != "user" and event.content is not None:
+                    if event.partial:
+                        first_chunk = first_chunk or arrived
+                    else:
+                        spans.append(self._model_span(event, ready, arrived, first_chunk, trace_id, agent_span))
+                        for call in event.get_function_calls():
+                            span = Span("tool", call.name, arrived, trace_id, agent_span, call_id=call.id)
+                            open_tools[call.id] = span
+                            spans.append(span)
+                        first_chunk = None
+                        ready = arrived
+                last_event = arrived
+                # Kept current so a caller that breaks out early (on the final
+                # response, say) sees complete timings before the stream closes
+                turn.end = arrived
+                if agent_span is not None:
+                    agent_span.end = arrived
+                yield event
+        finally:
+            await events.aclose()
+            for call_id, span in open_tools.items():
+                self.plugin.times.pop(call_id, None)
+                span.end = last_event
+                span.attributes["status"] = "incomplete"
+            turn.end = last_event
+
+    @staticmethod
+    def _model_span(event, ready, arrived, first_chunk, trace_id, parent) -> Span:
+        span = Span("model", "model", ready, trace_id, parent, agent=parent.name if parent else "")
+        span.end = arrived
+        usage = event.usage_metadata
+        if usage is not None:
+            span.attributes["input_tokens"] = usage.prompt_token_count or 0
+            span.attributes["output_tokens"] = usage.candidates_token_count or 0
+        if event.model_version:
+            span.attributes["model"] = event.model_version
+        if first_chunk is not None:
+            span.attributes["time_to_first_chunk_ms"] = round((first_chunk - ready) / 1e6, 2)
+        return span
+
+    def summary(self, turn: int = -1) -> dict:
+        """Where one turn (the last by default) spent its time."""
+        spans = self.turns[turn]
+        models = [s for s in spans if s.kind == "model"]
+        tools = [s for s in spans if s.kind == "tool" and s.name != "transfer_to_agent"]
+        return {
+            "turn_ms": round(spans[0].duration_ms, 2),
+            "model_calls": len(models),
+            "model_ms": round(sum(s.duration_ms for s in models), 2),
+            "input_tokens": sum(s.attributes.get("input_tokens", 0) for s in models),
+            "output_tokens": sum(s.attributes.get("output_tokens", 0) for s in models),
+            "tool_calls": len(tools),
+            # Parallel calls overlap, so this is the wall time spent waiting on tools
+            "tool_ms": round(_covered_ms(tools), 2),
+            "transfers": sum(s.kind == "transfer" for s in spans),
+            "agents": list(dict.fromkeys(s.name for s in spans if s.kind == "agent")),
+        }
+
+    def format_summary(self, turn: int = -1) -> str:
+        s = self.summary(turn)
+        return (
+            f"Turn took {s['turn_ms']:.0f} ms: model {s['model_ms']:.0f} ms "
+            f"({s['model_calls']} calls, {s['input_tokens']} in / {s['output_tokens']} out tokens), "
+            f"tools {s['tool_ms']:.0f} ms ({s['tool_calls']} calls), {s['transfers']} transfers"
+        )
+
+    def _unix_ns(self, perf_ns: int) -> int:
+        return self._epoch_wall_ns + (perf_ns - self._epoch_perf_ns)
+
+    def to_otlp(self) -> dict:
+        """The kept turns' spans as an OTLP/JSON ``ExportTraceServiceRequest``."""
+        otlp_spans = []
+        for spans in self.turns:
+            for span in spans:
+                attributes = {"adk.span.kind": span.kind, **span.attributes}
+                if span.kind == "agent":
+                    attributes["gen_ai.agent.name"] = span.name
+                elif span.kind == "tool":
+                    attributes["gen_ai.tool.name"] = span.name
+                elif span.kind == "model":
+                    attributes["gen_ai.usage.input_tokens"] = attributes.pop("input_tokens", 0)
+                    attributes["gen_ai.usage.output_tokens"] = attributes.pop("output_tokens", 0)
+                otlp_span = {
+                    "traceId": span.trace_id,
+                    "spanId": span.span_id,
+                    "name": f"{span.kind} {span.name}" if span.kind != span.name else span.kind,
+                    "kind": 1,  # SPAN_KIND_INTERNAL
+                    "startTimeUnixNano": str(self._unix_ns(span.start)),
+                    "endTimeUnixNano": str(self._unix_ns(span.end or span.start)),
+                    "attributes": [_otlp_attribute(k, v) for k, v in attributes.items()],
+                }
+                if span.parent_id:
+                    otlp_span["parentSpanId"] = span.parent_id
+                otlp_spans.append(otlp_span)
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": otlp_spans}],
+            }]
+        }
+
+    def to_chrome_trace(self) -> dict:
+        """The kept turns' spans in the Chrome trace-event format.
+
+        Turns and agents (with their model calls) share one track; tool calls
+        get as many extra tracks as the most calls that overlapped.
+        """
+        events = []
+        tracks = {"turns": 0}
+        tool_tracks = []  # end time of the last span on each tool track
+
+        def track(name: str) -> int:
+            if name not in tracks:
+                tracks[name] = len(tracks)
+            return tracks[name]
+
+        for spans in self.turns:
+            for span in sorted(spans, key=lambda s: s.start):
+                if span.kind == "tool":
+                    lane = next((i for i, end in enumerate(tool_tracks) if end <= span.start), None)
+                    if lane is None:
+                        lane = len(tool_tracks)
+                        tool_tracks.append(0)
+                    tool_tracks[lane] = span.end or span.start
+                    tid = track(f"tools {lane + 1}")
+                else:
+                    tid = track("turns")
+                events.append({
+                    "name": f"model {span.attributes['agent']}" if span.kind == "model" else span.name,
+                    "cat": span.kind,
+                    "ph": "X",
+                    "ts": (span.start - self._epoch_perf_ns) / 1000,
+                    "dur": ((span.end or span.start) - span.start) / 1000,
+                    "pid": 1,
+                    "tid": tid,
+                    "args": span.attributes,
+                })
+        events.extend(
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+            for name, tid in tracks.items()
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: Path, format: str = "chrome") -> None:
+        """Write the kept turns' spans to ``path`` as "chrome" or "otlp" JSON."""
+        if format not in ("chrome", "otlp"):
+            raise ValueError(f"Unknown trace format '{format}'. Use 'chrome' or 'otlp'.")
+        data = self.to_chrome_trace() if format == "chrome" else self.to_otlp()
+        Path(path).write_text(json.dumps(data), encoding="utf-8")
+
+
+def _covered_ms(spans: list[Span]) -> float:
+    """Total time covered by at least one span."""
+    covered = 0
+    current_start = current_end = None
+    for span in sorted(spans, key=lambda s: s.start):
+        end = span.end or span.start
+        if current_end is None or span.start > current_end:
+            if current_end is not None:
+                covered += current_end - current_start
+            current_start, current_end = span.start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        covered += current_end - current_start
+    return covered / 1e6
+
+
+def _otlp_attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
@@ -0,0 +1,95 @@
+"""OpenWeather lookup tool shared by the tool-using agents.
+
+Upstream responses are cached per city for a few minutes, and concurrent
+lookups of the same city share one in-flight request.
+"""
+import os
+
+from .cache import TTLCache
+from .http_client import get, get_async
+
+OPENWEATHER_URL = "http://api.openweathermap.org/data/2.5/weather"
+
+# Current weather changes on the order of minutes
+WEATHER_CACHE_TTL = 300
+WEATHER_CACHE_SIZE = 1024
+
+# (status_code, json) per normalized city; only successful lookups are kept
+weather_cache = TTLCache(
+    maxsize=WEATHER_CACHE_SIZE,
+    ttl=WEATHER_CACHE_TTL,
+    cacheable=lambda result: result[0] == 200,
+)
+
+
+def _cache_key(city: str) -> str:
+    return " ".join(city.split()).casefold()
+
+
+def _params(city: str, api_key: str) -> dict:
+    return {"q": city, "appid": api_key, "units": "metric"}
+
+
+def _report(city: str, status_code: int, data: dict) -> dict:
+    if status_code != 200:
+        return {"status": "error", "error_message": data.get("message", "Failed to fetch weather.")}
+
+    weather_description = data["weather"][0]["description"]
+    temperature = data["main"]["temp"]
+    return {
+        "status": "success",
+        "report": f"The current weather in {city} is {weather_description} with a temperature of {temperature}°C.",
+    }
+
+
+def get_weather(city: str) -> dict:
+    """Retrieves the current weather and temperature for a specified city.
+
+    Args:
+        city (str): The name of the city.
+
+    Returns:
+        dict: status and result or error msg.
+    """
+    api_key = os.getenv("OPENWEATHER_API_KEY")
+    if not api_key:
+        return {"status": "error", "error_message": "OpenWeather API key not configured."}
+
+    def fetch():
+        response = get(OPENWEATHER_URL, params=_params(city, api_key))
+        return response.status_code, response.json()
+
+    try:
+        status_code, data = weather_cache.get_or_load(_cache_key(city), fetch)
+        return _report(city, status_code, data)
+    except Exception as e:
+        return {"status": "error", "error_message": str(e)}
+
+
+async def get_weather_async(city: str) -> dict:
+    """Retrieves the current weather and temperature for a specified city.
+
+    Args:
+        city (str): The name of the city.
+
+    Returns:
+        dict: status and result or error msg.
+    """
+    api_key = os.getenv("OPENWEATHER_API_KEY")
+    if not api_key:
+        return {"status": "error", "error_message": "OpenWeather API key not configured."}
+
+    async def fetch():
+        response = await get_async(OPENWEATHER_URL, params=_params(city, api_key))
+        return response.status_code, response.json()
+
+    try:
+        status_code, data = await weather_cache.get_or_load_async(_cache_key(city), fetch)
+        return _report(city, status_code, data)
+    except Exception as e:
+        return {"status": "error", "error_message": str(e)}
+
+
+def weather_cache_stats() -> dict:
+    """Hit-rate metrics for the weather cache."""
+    return weather_cache.stats()
@@ -0,0 +1,97 @@
+from agent_rag.bm25 import BM25Index, identifiers, tokenize
+from agent_rag.filters import build_filter
+
+PRODUCT = "Model HD9285 air fryer, part AF-200. Fries cook at 200 degrees in 12 minutes."
+WARRANTY = "Clause 4.2: the warranty covers year 1. Error E3 means the fan has stopped."
+MANUAL = "Section 2 lists 4 accessories. Clean the basket after 10 uses."
+
+
+def make_index() -> BM25Index:
+    index = BM25Index()
+    index.add("product", PRODUCT, {"source": "product.pdf", "page": 1, "page_end": 1})
+    index.add("warranty", WARRANTY, {"source": "warranty.pdf", "page": 3, "page_end": 4})
+    index.add("manual", MANUAL, {"source": "manual.pdf", "page": 7, "page_end": 7})
+    return index
+
+
+def test_tokenize_keeps_dotted_identifiers_whole():
+    assert tokenize("Clause 4.2, part AF-200.") == ["clause", "4", "2", "part", "af", "200", "4.2", "af-200"]
+    # Dashed words without digits are only split
+    assert tokenize("well-known") == ["well", "known"]
+
+
+def test_identifiers_skip_plain_numbers_and_ordinals():
+    assert identifiers("HD9285 clause 4.2 error E3 AF-200") == ["hd9285", "4.2", "e3", "af-200"]
+    assert identifiers("fries at 200 degrees in year 1, 1st use") == []
+
+
+def test_search_ranks_the_matching_chunk_first():
+    hits = make_index().search("error E3 fan")
+    assert hits[0]["id"] == "warranty"
+    assert hits[0]["source"] == "warranty.pdf"
+
+
+def test_rarer_terms_score_higher():
+    index = make_index()
+    index.add("other", "The fan runs quietly.", {"source": "other.pdf", "page": 1, "page_end": 1})
+    # "e3" occurs in one chunk, "fan" in two
+    e3 = index.search("e3")[0]["bm25"]
+    fan = max(hit["bm25"] for hit in index.search("fan"))
+    assert e3 > fan
+
+
+def test_search_applies_filters():
+    index = make_index()
+    assert [hit["id"] for hit in index.search("4", where=build_filter(["manual.pdf"]))] == ["manual"]
+    assert index.search("clause", where=build_filter(page_start=5)) == []
+    assert [hit["id"] for hit in index.search("clause", where=build_filter(page_end=3))] == ["warranty"]
+
+
+def test_remove_drops_postings_and_length():
+    index = make_index()
+    total = index.total_length
+    index.remove("warranty")
+    assert len(index) == 2
+    assert index.search("e3") == []
+    assert "4.2" not in index.postings
+    assert index.total_length == total - len(tokenize(WARRANTY))
+
+
+def test_add_replaces_an_existing_chunk():
+    index = make_index()
+    index.add("warranty", "Clause 5.1 replaces the old terms.", {"source": "warranty.pdf", "page": 3, "page_end": 3})
+    assert len(index) == 3
+    assert index.search("e3") == []
+    assert index.search("5.1")[0]["id"] == "warranty"
+
+
+def test_keyword_queries_need_an_indexed_identifier():
+    index = make_index()
+    for query in ["HD9285", "clause 4.2", "error E3", "AF-200"]:
+        assert index.is_keyword_query(query), query
+    for query in [
+        "error E7",  # not in the index
+        "clause 2.4",  # 2 and 4 are indexed, but never as "2.4"
+        "what is covered in year 1",
+        "fries at 200 degrees",
+        "clean basket after 10 uses",
+        "which air fryer model HD9285 is best for a family of five people",  # too long
+    ]:
+        assert not index.is_keyword_query(query), query
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = make_index()
+    index.revision = 7
+    path = tmp_path / "bm25.json"
+    index.save(path)
+    loaded = BM25Index.load(path)
+    assert loaded.revision == 7
+    assert loaded.postings == index.postings
+    assert loaded.search("clause 4.2") == index.search("clause 4.2")
+
+
+def test_load_missing_file_returns_empty_index(tmp_path):
+    index = BM25Index.load(tmp_path / "missing.json")
+    assert len(index) == 0
+    assert index.revision is None
@@ -0,0 +1,158 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from shared_tools.cache import TTLCache
+
+
+def test_hit_after_load():
+    cache = TTLCache()
+    assert cache.get_or_load("k", lambda: 1) == 1
+    assert cache.get_or_load("k", lambda: 2) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_expired_entry_is_reloaded():
+    cache = TTLCache(ttl=0.01)
+    cache.get_or_load("k", lambda: 1)
+    time.sleep(0.02)
+    assert cache.get_or_load("k", lambda: 2) == 2
+
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(maxsize=2)
+    cache.get_or_load("a", lambda: 1)
+    cache.get_or_load("b", lambda: 2)
+    cache.get_or_load("a", lambda: 0)  # a is now the most recently used
+    cache.get_or_load("c", lambda: 3)
+    assert cache.get_or_load("a", lambda: 0) == 1
+    assert cache.get_or_load("b", lambda: 0) == 0
+    assert cache.stats()["evictions"] == 2
+
+
+def test_uncacheable_values_are_not_stored():
+    cache = TTLCache(cacheable=lambda value: value != "error")
+    cache.get_or_load("k", lambda: "error")
+    assert cache.get_or_load("k", lambda: "ok") == "ok"
+
+
+def test_threads_share_one_load():
+    cache = TTLCache()
+    started = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return "value"
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader)))
+    first.start()
+    started.wait()
+    second = threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader)))
+    second.start()
+    first.join()
+    second.join()
+    assert results == ["value", "value"]
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 1
+
+
+def test_coroutines_share_one_load():
+    cache = TTLCache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_load_async("k", loader) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["value"] * 5
+    assert len(calls) == 1
+
+
+def test_loader_error_reaches_every_caller_and_is_not_cached():
+    cache = TTLCache()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def ok():
+        return "value"
+
+    async def main():
+        results = await asyncio.gather(
+            cache.get_or_load_async("k", failing),
+            cache.get_or_load_async("k", failing),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+        return await cache.get_or_load_async("k", ok)
+
+    assert asyncio.run(main()) == "value"
+
+
+def test_cancelled_owner_does_not_fail_waiters():
+    cache = TTLCache()
+
+    async def loader():
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def main():
+        owner = asyncio.create_task(cache.get_or_load_async("k", loader))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_load_async("k", loader))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        return await waiter
+
+    assert asyncio.run(main()) == "value"
+    assert cache.stats()["size"] == 1
+
+
+def test_owner_timeout_keeps_load_for_waiters():
+    cache = TTLCache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def main():
+        owner = asyncio.wait_for(cache.get_or_load_async("k", loader), 0.01)
+        waiter = cache.get_or_load_async("k", loader)
+        return await asyncio.gather(owner, waiter, return_exceptions=True)
+
+    owner_result, waiter_result = asyncio.run(main())
+    assert isinstance(owner_result, TimeoutError)
+    assert waiter_result == "value"
+    assert len(calls) == 1
+
+
+def test_cancelled_waiter_does_not_cancel_load():
+    cache = TTLCache()
+
+    async def loader():
+        await asyncio.sleep(0.02)
+        return "value"
+
+    async def main():
+        owner = asyncio.create_task(cache.get_or_load_async("k", loader))
+        waiter = asyncio.create_task(cache.get_or_load_async("k", loader))
+        await asyncio.sleep(0.005)
+        waiter.cancel()
+        return await owner
+
+    assert asyncio.run(main()) == "value"
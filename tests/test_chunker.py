@@ -0,0 +1,118 @@
+import pytest
+
+from agent_rag.chunker import (
+    ChunkStats,
+    FixedTokenChunker,
+    ParagraphChunker,
+    SentenceChunker,
+    count_tokens,
+    make_chunker,
+)
+
+
+def sentence(label: str, n_words: int) -> str:
+    """A sentence of ``n_words`` words plus its full stop (n_words + 1 tokens)."""
+    return " ".join(f"{label}{i}" for i in range(n_words)) + "."
+
+
+def test_count_tokens_counts_words_and_punctuation():
+    assert count_tokens("Hello, world!") == 4
+    assert count_tokens("") == 0
+
+
+def test_make_chunker_rejects_unknown_strategy():
+    assert isinstance(make_chunker("fixed", max_tokens=10, overlap=2), FixedTokenChunker)
+    with pytest.raises(ValueError):
+        make_chunker("semantic")
+
+
+@pytest.mark.parametrize("cls", [FixedTokenChunker, SentenceChunker])
+def test_overlap_must_be_smaller_than_chunks(cls):
+    with pytest.raises(ValueError):
+        cls(max_tokens=10, overlap=10)
+
+
+def test_paragraph_chunker_drops_short_fragments():
+    long_para = "A paragraph that is comfortably longer than fifty characters in total."
+    chunks = list(ParagraphChunker().chunk([(3, f"{long_para}\n\nToo short.")]))
+    assert [chunk["text"] for chunk in chunks] == [long_para]
+    assert chunks[0]["page"] == chunks[0]["page_end"] == 3
+
+
+def test_fixed_windows_overlap_and_cover_every_token():
+    text = " ".join(f"w{i}" for i in range(25))
+    chunks = list(FixedTokenChunker(max_tokens=10, overlap=3).chunk([(1, text)]))
+    words = [chunk["text"].split() for chunk in chunks]
+    assert [len(w) for w in words] == [10, 10, 10, 4]
+    for previous, current in zip(words, words[1:]):
+        assert previous[-3:] == current[:3]
+    assert words[-1][-1] == "w24"
+
+
+def test_fixed_chunks_span_page_breaks():
+    pages = [(1, " ".join(f"a{i}" for i in range(6))), (2, " ".join(f"b{i}" for i in range(6)))]
+    chunks = list(FixedTokenChunker(max_tokens=8, overlap=0).chunk(pages))
+    assert (chunks[0]["page"], chunks[0]["page_end"]) == (1, 2)
+    assert (chunks[1]["page"], chunks[1]["page_end"]) == (2, 2)
+
+
+def test_sentence_chunks_keep_sentences_whole_within_budget():
+    text = " ".join(sentence(label, 5) for label in "abcdefgh")  # 6 tokens each
+    chunks = list(SentenceChunker(max_tokens=20, overlap=0, min_tokens=1).chunk([(1, text)]))
+    for chunk in chunks:
+        assert chunk["n_tokens"] <= 20
+        assert chunk["n_tokens"] == count_tokens(chunk["text"])
+        assert chunk["text"].endswith(".")
+    assert " ".join(chunk["text"] for chunk in chunks) == text
+
+
+def test_sentence_overlap_repeats_trailing_sentences():
+    text = " ".join(sentence(label, 5) for label in "abcdef")  # 6 tokens each
+    chunks = list(SentenceChunker(max_tokens=18, overlap=6, min_tokens=1).chunk([(1, text)]))
+    assert chunks[0]["text"] == " ".join(sentence(label, 5) for label in "abc")
+    # The last sentence of each chunk opens the next
+    assert chunks[1]["text"].startswith(sentence("c", 5))
+    for chunk in chunks:
+        assert chunk["n_tokens"] <= 18
+
+
+def test_sentence_longer_than_budget_is_split():
+    chunks = list(SentenceChunker(max_tokens=10, overlap=0, min_tokens=1).chunk([(1, sentence("x", 24))]))
+    assert [chunk["n_tokens"] for chunk in chunks] == [10, 10, 5]
+
+
+def test_small_tail_is_merged_into_previous_chunk():
+    text = " ".join([sentence("a", 9), sentence("b", 9), sentence("c", 2)])  # 10 + 10 + 3 tokens
+    chunks = list(SentenceChunker(max_tokens=20, overlap=0, min_tokens=5).chunk([(1, text)]))
+    assert len(chunks) == 1
+    assert chunks[0]["text"] == text
+    assert chunks[0]["n_tokens"] == 23
+
+
+def test_merged_tail_counts_overlap_once():
+    text = " ".join([sentence("a", 9), sentence("b", 9), sentence("c", 2)])
+    chunks = list(SentenceChunker(max_tokens=12, overlap=10, min_tokens=5).chunk([(1, text)]))
+    for chunk in chunks:
+        assert chunk["n_tokens"] == count_tokens(chunk["text"])
+
+
+def test_sentence_chunks_record_page_range():
+    pages = [(4, sentence("a", 5)), (5, ""), (6, sentence("b", 5))]
+    chunks = list(SentenceChunker(max_tokens=50, overlap=0).chunk(pages))
+    assert len(chunks) == 1
+    assert (chunks[0]["page"], chunks[0]["page_end"]) == (4, 6)
+
+
+def test_empty_document_yields_no_chunks():
+    assert list(SentenceChunker().chunk([(1, ""), (2, "   ")])) == []
+    assert list(FixedTokenChunker().chunk([])) == []
+
+
+def test_chunk_stats_summary():
+    stats = ChunkStats()
+    assert stats.summary() == {"chunks": 0}
+    for size in [10, 20, 30, 40]:
+        stats.add(size)
+    summary = stats.summary()
+    assert (summary["chunks"], summary["min_tokens"], summary["max_tokens"]) == (4, 10, 40)
+    assert summary["mean_tokens"] == 25.0
@@ -0,0 +1,111 @@
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from shared_tools.compaction import (
+    FOREIGN_EVENT_PREFIX,
+    HistoryCompactor,
+    estimate_tokens,
+    is_user_message,
+)
+
+
+def user(text: str) -> types.Content:
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+def model(text: str) -> types.Content:
+    return types.Content(role="model", parts=[types.Part(text=text)])
+
+
+def tool_turn(question: str, city: str, result: dict) -> list[types.Content]:
+    call = types.Part(function_call=types.FunctionCall(id=f"call-{city}", name="get_weather", args={"city": city}))
+    response = types.Part(function_response=types.FunctionResponse(id=f"call-{city}", name="get_weather", response=result))
+    return [
+        user(question),
+        types.Content(role="model", parts=[call]),
+        types.Content(role="user", parts=[response]),
+        model(f"It is {result['report']} in {city}."),
+    ]
+
+
+def history(n_turns: int, words: int = 50) -> list[types.Content]:
+    contents = []
+    for i in range(n_turns):
+        contents += [user(f"Question {i}? " + "word " * words), model(f"Answer {i}. " + "word " * words)]
+    return contents
+
+
+def test_is_user_message():
+    assert is_user_message(user("Hi"))
+    assert not is_user_message(model("Hi"))
+    assert not is_user_message(user(f"{FOREIGN_EVENT_PREFIX} [other_agent] said: Hi"))
+    tool_result = tool_turn("Weather?", "Paris", {"report": "sunny"})[2]
+    assert not is_user_message(tool_result)
+
+
+def test_within_budget_is_unchanged():
+    contents = history(5)
+    compacted, turns = HistoryCompactor(max_tokens=10_000).compact(contents)
+    assert compacted is contents
+    assert turns == 0
+
+
+def test_few_turns_are_never_compacted():
+    contents = history(3, words=500)
+    compacted, turns = HistoryCompactor(max_tokens=10, keep_turns=3).compact(contents)
+    assert compacted is contents
+    assert turns == 0
+
+
+def test_older_turns_fold_into_one_summary():
+    contents = history(10)
+    compactor = HistoryCompactor(max_tokens=estimate_tokens(contents) // 2, keep_turns=3)
+    compacted, turns = compactor.compact(contents)
+    assert turns == 7
+    # One summary message, then the last three turns verbatim
+    assert compacted[1:] == contents[-6:]
+    summary = compacted[0].parts[0].text
+    assert summary.startswith(FOREIGN_EVENT_PREFIX)
+    assert not is_user_message(compacted[0])
+    assert "- User: Question 6?" in summary
+    assert estimate_tokens(compacted) <= compactor.max_tokens
+
+
+def test_tool_results_are_kept_in_the_summary():
+    # The long question is shortened, leaving room for the tool result
+    question = "Weather in Paris? " + "please " * 300
+    contents = tool_turn(question, "Paris", {"report": "sunny"}) + history(3)
+    compacted, _ = HistoryCompactor(max_tokens=estimate_tokens(contents[4:]) + 150).compact(contents)
+    summary = compacted[0].parts[0].text
+    assert 'Tool get_weather({"city": "Paris"}) returned: {"report": "sunny"}' in summary
+    assert "Assistant: It is sunny in Paris." in summary
+
+
+def test_large_tool_results_are_omitted_when_they_do_not_fit():
+    contents = tool_turn("Weather?", "Paris", {"report": "sunny " * 2000}) + history(3)
+    compactor = HistoryCompactor(max_tokens=estimate_tokens(history(3)) + 150)
+    compacted, _ = compactor.compact(contents)
+    summary = compacted[0].parts[0].text
+    assert "was called (result omitted)" in summary
+    assert estimate_tokens(compacted) <= compactor.max_tokens
+
+
+def test_oldest_turns_are_dropped_once_nothing_fits():
+    contents = history(10)
+    compactor = HistoryCompactor(max_tokens=estimate_tokens(contents[-6:]) + 10)
+    compacted, turns = compactor.compact(contents)
+    assert turns == 7
+    assert "earlier turns are no longer shown" in compacted[0].parts[0].text
+
+
+def test_stats_report_tokens_saved():
+    compactor = HistoryCompactor(max_tokens=200)
+    request = LlmRequest(contents=history(10))
+    before = estimate_tokens(request.contents)
+    assert compactor.before_model_callback(None, request) is None
+    stats = compactor.stats()
+    assert stats["model_calls"] == stats["compacted_calls"] == 1
+    assert stats["tokens_before"] == before
+    assert stats["tokens_after"] == estimate_tokens(request.contents) < before
+    assert stats["tokens_saved"] == before - stats["tokens_after"]
+    assert "older turns compacted" in compactor.format_last()
@@ -0,0 +1,36 @@
+from agent_rag.filters import build_filter, chroma_where, matches_filter
+
+CHUNK = {"source": "manual.pdf", "page": 3, "page_end": 5}
+
+
+def test_no_filter_is_none():
+    assert build_filter() is None
+    assert build_filter(sources=[], page_start=0, page_end=0) is None
+    assert chroma_where(None) is None
+    assert matches_filter(CHUNK, None)
+
+
+def test_sources_are_sorted():
+    assert build_filter(sources=["b.pdf", "a.pdf"]) == {"sources": ["a.pdf", "b.pdf"]}
+
+
+def test_single_clause_is_not_wrapped():
+    assert chroma_where(build_filter(sources=["a.pdf"])) == {"source": {"$in": ["a.pdf"]}}
+
+
+def test_page_range_compares_against_chunk_span():
+    where = chroma_where(build_filter(page_start=4, page_end=6))
+    assert where == {"$and": [{"page_end": {"$gte": 4}}, {"page": {"$lte": 6}}]}
+
+
+def test_chunk_overlapping_the_range_matches():
+    # The chunk spans pages 3-5
+    assert matches_filter(CHUNK, build_filter(page_start=5))
+    assert matches_filter(CHUNK, build_filter(page_end=3))
+    assert not matches_filter(CHUNK, build_filter(page_start=6))
+    assert not matches_filter(CHUNK, build_filter(page_end=2))
+
+
+def test_source_must_be_listed():
+    assert matches_filter(CHUNK, build_filter(sources=["manual.pdf", "faq.pdf"]))
+    assert not matches_filter(CHUNK, build_filter(sources=["faq.pdf"]))
@@ -0,0 +1,137 @@
+import asyncio
+import time
+
+import pytest
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from shared_tools.sessions import BatchedSqliteSessionService, BoundedInMemorySessionService
+
+APP = "app"
+
+
+def event(text: str, author: str = "user", state_delta: dict | None = None) -> Event:
+    return Event(
+        invocation_id="inv",
+        author=author,
+        content=types.Content(role="user" if author == "user" else "model", parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta=state_delta or {}),
+    )
+
+
+@pytest.fixture
+def sqlite_service(tmp_path):
+    service = BatchedSqliteSessionService(tmp_path / "sessions.db", commit_interval=60)
+    yield service
+    service.close()
+
+
+# --- BatchedSqliteSessionService ---
+def test_events_and_state_survive_reopening(tmp_path):
+    async def write():
+        service = BatchedSqliteSessionService(tmp_path / "sessions.db")
+        session = await service.create_session(app_name=APP, user_id="u", session_id="s")
+        await service.append_event(session, event("hi", state_delta={"topic": "weather", "user:name": "Ann"}))
+        await service.append_event(session, event("hello", author="agent"))
+        service.close()
+
+    async def read():
+        service = BatchedSqliteSessionService(tmp_path / "sessions.db")
+        try:
+            return await service.get_session(app_name=APP, user_id="u", session_id="s")
+        finally:
+            service.close()
+
+    asyncio.run(write())
+    session = asyncio.run(read())
+    assert [e.content.parts[0].text for e in session.events] == ["hi", "hello"]
+    assert session.state == {"topic": "weather", "user:name": "Ann"}
+
+
+def test_events_are_committed_in_batches(sqlite_service):
+    async def run():
+        session = await sqlite_service.create_session(app_name=APP, user_id="u")
+        commits = sqlite_service.commits
+        for i in range(5):
+            call = types.Part(function_call=types.FunctionCall(id=f"call-{i}", name="get_weather", args={}))
+            await sqlite_service.append_event(session, Event(
+                invocation_id="inv", author="agent", content=types.Content(role="model", parts=[call]),
+            ))
+        batched = sqlite_service.commits - commits
+        await sqlite_service.flush()
+        return batched, sqlite_service.commits - commits
+
+    # Tool calls don't end the turn, so nothing is committed until the flush
+    assert asyncio.run(run()) == (0, 1)
+    assert sqlite_service.stats()["events_written"] == 5
+
+
+def test_stale_session_is_rejected_and_lock_released(sqlite_service, tmp_path):
+    async def run():
+        session = await sqlite_service.create_session(app_name=APP, user_id="u", session_id="s")
+        stale = await sqlite_service.get_session(app_name=APP, user_id="u", session_id="s")
+        await sqlite_service.append_event(session, event("first"))
+        with pytest.raises(ValueError, match="stale session"):
+            await sqlite_service.append_event(stale, event("second"))
+
+    asyncio.run(run())
+    # Another worker can still write
+    other = BatchedSqliteSessionService(tmp_path / "sessions.db")
+    try:
+        asyncio.run(other.create_session(app_name=APP, user_id="u", session_id="t"))
+    finally:
+        other.close()
+
+
+def test_list_and_delete(sqlite_service):
+    async def run():
+        for session_id in ("a", "b"):
+            await sqlite_service.create_session(app_name=APP, user_id="u", session_id=session_id)
+        await sqlite_service.delete_session(app_name=APP, user_id="u", session_id="a")
+        listed = await sqlite_service.list_sessions(app_name=APP, user_id="u")
+        return [session.id for session in listed.sessions]
+
+    assert asyncio.run(run()) == ["b"]
+
+
+# --- BoundedInMemorySessionService ---
+def test_idle_session_is_dropped_on_read():
+    service = BoundedInMemorySessionService(idle_timeout=0.01)
+
+    async def run():
+        await service.create_session(app_name=APP, user_id="u", session_id="s")
+        time.sleep(0.02)
+        return await service.get_session(app_name=APP, user_id="u", session_id="s")
+
+    assert asyncio.run(run()) is None
+    assert service.stats()["evicted"] == 1
+
+
+def test_least_recently_used_is_dropped_over_memory_ceiling():
+    service = BoundedInMemorySessionService(max_bytes=1000)
+
+    async def run():
+        old = await service.create_session(app_name=APP, user_id="u", session_id="old")
+        new = await service.create_session(app_name=APP, user_id="u", session_id="new")
+        await service.append_event(old, event("x" * 400))
+        await service.append_event(new, event("y" * 400))
+        return (
+            await service.get_session(app_name=APP, user_id="u", session_id="old"),
+            await service.get_session(app_name=APP, user_id="u", session_id="new"),
+        )
+
+    old, new = asyncio.run(run())
+    assert old is None
+    assert new is not None
+    assert service.stats()["event_bytes"] <= 1000
+
+
+def test_delete_is_not_counted_as_eviction():
+    service = BoundedInMemorySessionService(idle_timeout=60)
+
+    async def run():
+        await service.create_session(app_name=APP, user_id="u", session_id="s")
+        await service.delete_session(app_name=APP, user_id="u", session_id="s")
+
+    asyncio.run(run())
+    assert service.stats() == {"sessions": 0, "event_bytes": 0, "max_bytes": None, "evicted": 0}
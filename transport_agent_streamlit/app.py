@@ -6,12 +6,24 @@ env_path = Path(__file__).parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
 import asyncio
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
 import streamlit as st
+from google.adk.agents import LlmAgent
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 from google.genai import types
 from agent import root_agent
 
+# `streamlit run app.py` runs from this folder; shared_tools lives one level up
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from shared_tools.agents import iter_agents
+from shared_tools.sessions import get_or_create_session, make_session_service
+
 # --- Page Config ---
 st.set_page_config(
     page_title="Transport Planner Agent",
@@ -22,55 +34,154 @@ st.set_page_config(
 st.title("🚗 Transport Planner Agent")
 st.markdown("Plan your travel with AI-powered transport recommendations.")
 
-# --- Session State ---
-if "messages" not in st.session_state:
-    st.session_state.messages = []
-if "session_service" not in st.session_state:
-    st.session_state.session_service = InMemorySessionService()
-if "session_created" not in st.session_state:
-    st.session_state.session_created = False
-
 APP_NAME = "transport_streamlit_app"
-USER_ID = "streamlit_user"
-SESSION_ID = "streamlit_session"
 
+# Limits on the shared in-memory session store (not used when SESSION_DB is set):
+# chats idle this long are forgotten, and the oldest go first past the memory ceiling
+SESSION_IDLE_MINUTES = float(os.getenv("SESSION_IDLE_MINUTES", "30"))
+SESSION_MEMORY_MB = float(os.getenv("SESSION_MEMORY_MB", "256"))
+
+# Stream model text as it is generated instead of one event per finished response
+RUN_CONFIG = RunConfig(streaming_mode=StreamingMode.SSE)
+
+AGENT_LABELS = {
+    "travel_agent": "🧭 Travel Planner",
+    "transport_research_agent": "🔍 Research Agent",
+    "budget_agent": "💰 Budget Agent",
+    "time_management_agent": "⏰ Time Agent",
+}
+
+
+# --- Shared Resources ---
+# Created once per server process and reused by every rerun and browser tab
+@st.cache_resource
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """One event loop, running for the life of the server on a background thread.
+
+    Model clients keep their connection pools between turns, which they could
+    not do when each message ran in its own asyncio.run().
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="adk-event-loop", daemon=True).start()
+    return loop
+
+
+@st.cache_resource
+def get_runner() -> Runner:
+    """The Runner and session service shared by all chats."""
+    # An agent with a model name builds a new model client for every call;
+    # resolve each name once so all calls share one client
+    models = {}
+    for agent in iter_agents(root_agent):
+        if isinstance(agent, LlmAgent) and isinstance(agent.model, str) and agent.model:
+            agent.model = models.setdefault(agent.model, agent.canonical_model)
+    return Runner(
+        agent=root_agent,
+        app_name=APP_NAME,
+        # In memory by default; set SESSION_DB=sessions.db to keep chats across restarts
+        session_service=make_session_service(
+            idle_timeout=SESSION_IDLE_MINUTES * 60,
+            max_bytes=int(SESSION_MEMORY_MB * 1024 * 1024),
+        ),
+    )
 
-async def create_session():
-    """Create ADK session if not exists."""
-    if not st.session_state.session_created:
-        await st.session_state.session_service.create_session(
-            app_name=APP_NAME,
-            user_id=USER_ID,
-            session_id=SESSION_ID
-        )
-        st.session_state.session_created = True
 
+def run_on_loop(coro):
+    """Run a coroutine on the shared event loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
 
-async def run_agent(query: str) -> str:
-    """Run the agent and return the response."""
-    await create_session()
 
-    runner = Runner(
-        agent=root_agent,
-        app_name=APP_NAME,
-        session_service=st.session_state.session_service
-    )
+def stream_events(query: str, user_id: str, session_id: str):
+    """Yield the agent's events here while it runs on the shared event loop."""
+    runner = get_runner()
+    events = queue.Queue()
+    done = object()
 
-    content = types.Content(role='user', parts=[types.Part(text=query)])
-    response_text = ""
+    async def produce():
+        try:
+            await get_or_create_session(runner.session_service, APP_NAME, user_id, session_id)
+            content = types.Content(role='user', parts=[types.Part(text=query)])
+            async for event in runner.run_async(
+                user_id=user_id, session_id=session_id, new_message=content, run_config=RUN_CONFIG
+            ):
+                events.put(event)
+        finally:
+            events.put(done)
 
-    async for event in runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=content):
-        if event.is_final_response():
-            if event.content and event.content.parts:
-                response_text = event.content.parts[0].text
-            break
+    future = asyncio.run_coroutine_threadsafe(produce(), get_event_loop())
+    try:
+        while (event := events.get()) is not done:
+            yield event
+        future.result()  # re-raise anything the agent raised
+    finally:
+        # The visitor left or sent a new message mid-turn: stop the agent too
+        future.cancel()
 
-    return response_text
 
+def get_chat():
+    """This visitor's ADK session, or None if it was never created or was evicted."""
+    return run_on_loop(get_runner().session_service.get_session(
+        app_name=APP_NAME, user_id=st.session_state.user_id, session_id=st.session_state.session_id
+    ))
 
-def get_response(query: str) -> str:
-    """Wrapper to run async function."""
-    return asyncio.run(run_agent(query))
+
+def event_text(event) -> str:
+    parts = event.content.parts if event.content and event.content.parts else []
+    return "".join(part.text for part in parts if part.text and not part.thought)
+
+
+# --- Session State ---
+# Each browser session gets its own user and session ids; many visitors share
+# one Runner and session store. The ids stay server-side (not in the URL), so
+# a shared link never opens someone else's chat.
+if "user_id" not in st.session_state:
+    st.session_state.user_id = uuid.uuid4().hex
+    st.session_state.session_id = uuid.uuid4().hex
+if "messages" not in st.session_state:
+    st.session_state.messages = []
+
+
+def run_agent(query: str, status, output) -> str:
+    """Run the agent, streaming each sub-agent's text into the page as it arrives.
+
+    Args:
+        query (str): The user's message.
+        status: An ``st.status`` box that shows which agent is working.
+        output: The container the agents' replies are written into.
+
+    Returns:
+        str: The whole reply as markdown, for the chat history.
+    """
+    sections = []  # one per agent reply, in order
+    start = time.perf_counter()
+    first_chunk = None
+
+    for event in stream_events(query, st.session_state.user_id, st.session_state.session_id):
+        text = event_text(event)
+        if not text:
+            continue
+        first_chunk = first_chunk or time.perf_counter()
+
+        if not sections or sections[-1]["agent"] != event.author:
+            label = AGENT_LABELS.get(event.author, event.author)
+            status.update(label=f"{label} is working...")
+            status.write(f"{label} started after {time.perf_counter() - start:.1f} s")
+            output.markdown(f"**{label}**")
+            sections.append({"agent": event.author, "label": label, "done": "", "streaming": "", "view": output.empty()})
+
+        section = sections[-1]
+        if event.partial:
+            section["streaming"] += text
+        else:
+            # The closing event of a streamed response repeats its full text
+            section["done"] += text
+            section["streaming"] = ""
+        section["view"].markdown(section["done"] + section["streaming"] + ("▌" if event.partial else ""))
+
+    total = time.perf_counter() - start
+    waited = f" (first words after {first_chunk - start:.1f} s)" if first_chunk else ""
+    status.update(label=f"Plan ready in {total:.1f} s{waited}", state="complete")
+    return "\n\n".join(f"**{section['label']}**\n\n{section['done']}" for section in sections)
 
 
 # --- Display Chat History ---
@@ -80,6 +191,10 @@ for message in st.session_state.messages:
 
 # --- Chat Input ---
 if prompt := st.chat_input("Where would you like to travel? (e.g., 'Plan a trip from Orchard to Changi Airport')"):
+    if st.session_state.messages and get_chat() is None:
+        st.info("This chat was idle for a while and has been cleared, so the planner starts afresh.")
+        st.session_state.messages = []
+
     # Add user message to history
     st.session_state.messages.append({"role": "user", "content": prompt})
     with st.chat_message("user"):
@@ -87,9 +202,8 @@ if prompt := st.chat_input("Where would you like to travel? (e.g., 'Plan a trip
 
     # Get agent response
     with st.chat_message("assistant"):
-        with st.spinner("Planning your transport..."):
-            response = get_response(prompt)
-            st.markdown(response)
+        status = st.status("Planning your transport...")
+        response = run_agent(prompt, status, st.container())
 
     # Add assistant response to history
     st.session_state.messages.append({"role": "assistant", "content": response})
@@ -105,6 +219,10 @@ with st.sidebar:
     """)
 
     if st.button("Clear Chat"):
+        # Start the agent's memory afresh too, not just the visible history
+        run_on_loop(get_runner().session_service.delete_session(
+            app_name=APP_NAME, user_id=st.session_state.user_id, session_id=st.session_state.session_id
+        ))
         st.session_state.messages = []
-        st.session_state.session_created = False
+        st.session_state.session_id = uuid.uuid4().hex
         st.rerun()
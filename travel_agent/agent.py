@@ -8,6 +8,7 @@ env_path = Path(__file__).parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
 from google.adk.agents import Agent
+from shared_tools import run_in_thread
 from tavily import TavilyClient
 
 import warnings
@@ -35,6 +36,8 @@ tavily_client = TavilyClient(api_key=tavily_key)
 
 # ---------- TAVILY SEARCH TOOL ----------
 
+# Runs on a worker thread so a slow search doesn't block other sessions
+@run_in_thread
 def search_web(query: str) -> dict:
     try:
         response = tavily_client.search(query=query, max_results=3)